@@ -1,230 +1,795 @@
-import math
-import random
-from typing import Dict, List, Set, Tuple
-from .model import NeuralNet, Node, Connection
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from scipy.sparse import csr_matrix
+except ImportError:  # SciPy is optional; fall back to np.bincount accumulation
+    csr_matrix = None
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; fall back to the vectorized NumPy kernel
+    njit = None
+
+from .model import NeuralNet, Node, Connection, ModuleConfig
+
+# Below this fraction of active (non-zero activation) nodes, input sums are
+# scattered from the active sources only instead of touching every edge.
+SPARSE_ACTIVITY_RATIO = 0.1
+
+# Uniform randoms (spike jitter, NOISE inputs) are drawn in chunks of this size.
+RAND_POOL_SIZE = 4096
+# Upper bound on the uniforms pre-drawn for one fused step_batch kernel call
+BATCH_RAND_LIMIT = 1 << 20
+
+
+@dataclass
+class NetArrays:
+    """
+    Structure-of-Arrays view of the network used by the engine hot path.
+    Nodes are addressed by a dense integer index (see `index`), edges by
+    their position in the edge arrays (`conn_pos` maps them back to
+    net.connections). Only connections whose endpoints both exist are
+    materialized, sorted by target so the edge arrays double as the rows of
+    a CSR weight matrix (`indptr`).
+    """
+    node_ids: List[str]
+    index: Dict[str, int]
+    nodes: List[Node]
+    compute_idx: np.ndarray     # Indices of all non-INPUT nodes
+
+    # Update schedules, so the tick loop never re-checks node types
+    input_sin_nodes: List[Node]
+    sin_idx: np.ndarray
+    sin_freqs: np.ndarray
+    input_noise_nodes: List[Node]
+    noise_idx: np.ndarray
+    noise_periods: np.ndarray       # Ticks between samples (1 = every tick)
+    input_pulse_nodes: List[Node]   # Manual inputs (and unknown input types)
+    pulse_idx: np.ndarray
+    pulse_cleanup_nodes: List[Node] # INPUT/CONCEPT nodes with a PULSE inputType
+
+    # Node configuration (float32 copies captured at materialize time). Node
+    # state is not copied: the engine works on the net's state arrays directly.
+    thr: np.ndarray
+    decay: np.ndarray
+    bias: np.ndarray
+    is_pulse: np.ndarray
+
+    # Edges
+    conn_pos: np.ndarray        # Position of each edge in net.connections
+    src_idx: np.ndarray
+    tgt_idx: np.ndarray
+    brain_mod: np.ndarray       # Source BRAIN module index for external brain inputs, else -1
+    weight: np.ndarray
+    signal_strength: np.ndarray
+    sig_mask: np.ndarray        # Edges whose target is not an INPUT node
+
+    # Write-back bookkeeping for flush(): the edges' Connection objects, the
+    # net.conn_version `conn_pos` is valid for, and the weights / signals as
+    # last read from or written to the net
+    conns: List[Connection]
+    conn_version: int
+    synced_weight: np.ndarray
+    synced_signal: np.ndarray
+
+    # Derived from the edge arrays by _edge_index()
+    norm: np.ndarray            # 1/count for external BRAIN inputs, 1.0 otherwise
+    indptr: np.ndarray
+    out_order: np.ndarray       # Edge indices sorted by source...
+    out_ptr: np.ndarray         # ...with source i owning out_order[out_ptr[i]:out_ptr[i+1]]
+
+    # External BRAIN inputs: `brain_edges` sorted by (target, source module),
+    # grouped into runs starting at `group_starts` (offsets into brain_edges)
+    normal_edges: np.ndarray
+    brain_edges: np.ndarray
+    group_starts: np.ndarray
+    group_counts: np.ndarray
+    group_tgt: np.ndarray
+
+    # BRAIN modules with Hebbian learning enabled, and for each of them the
+    # indices of its internal edges
+    hebbian_modules: List[ModuleConfig]
+    module_internal_conn_idx: Dict[str, np.ndarray]
+
+    # W[tgt, src] = weight * norm, so that input_sums = W @ act (SciPy only)
+    w_csr: Optional[Any] = None
+    weights_dirty: bool = False # `weight` changed since w_csr.data was written
+
+
+def _edge_index(n: int, src_idx: np.ndarray, tgt_idx: np.ndarray,
+                brain_mod: np.ndarray, weight: np.ndarray) -> Dict[str, Any]:
+    """
+    Derive the CSR pointers, brain-input groups and normalization factors
+    from edge arrays sorted by (target, brain_mod).
+    """
+    is_brain = brain_mod >= 0
+    normal_edges = np.flatnonzero(~is_brain)
+    brain_edges = np.flatnonzero(is_brain)
+    b_tgt = tgt_idx[brain_edges]
+    b_mod = brain_mod[brain_edges]
+    new_group = np.ones(len(brain_edges), dtype=bool)
+    new_group[1:] = (b_tgt[1:] != b_tgt[:-1]) | (b_mod[1:] != b_mod[:-1])
+    group_starts = np.flatnonzero(new_group)
+    group_counts = np.diff(np.append(group_starts, len(brain_edges)))
+
+    norm = np.ones(len(tgt_idx), dtype=np.float32)
+    norm[brain_edges] = np.repeat(1.0 / group_counts, group_counts)
+
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(tgt_idx, minlength=n), out=indptr[1:])
+
+    # Outgoing CSR for spike-driven propagation
+    out_order = np.argsort(src_idx, kind='stable')
+    out_ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src_idx, minlength=n), out=out_ptr[1:])
+
+    # SpMV is memory bound: keep W at float32 data with int32 indices/indptr.
+    # The edge order is preserved (row indices are left unsorted) so that
+    # w_csr.data stays aligned with the edge arrays.
+    w_csr = None
+    if csr_matrix is not None:
+        w_csr = csr_matrix((np.multiply(weight, norm, dtype=np.float32),
+                            src_idx.astype(np.int32, copy=False), indptr),
+                           shape=(n, n), dtype=np.float32, copy=False)
+
+    return dict(
+        norm=norm,
+        indptr=indptr,
+        out_order=out_order,
+        out_ptr=out_ptr,
+        normal_edges=normal_edges,
+        brain_edges=brain_edges,
+        group_starts=group_starts,
+        group_counts=group_counts.astype(np.float32),
+        group_tgt=b_tgt[group_starts],
+        w_csr=w_csr,
+    )
+
+
+def _hebbian_params(module: ModuleConfig) -> Tuple[float, float]:
+    # (learning rate, pruning threshold) with the TS defaults
+    rate = module.learningRate or 0.01
+    pruning_thresh = module.pruningThreshold if module.pruningThreshold is not None else 0.05
+    return rate, pruning_thresh
+
+
+def _hebbian_edges(arr: NetArrays) -> Tuple[np.ndarray, np.ndarray]:
+    # Internal edges of all Hebbian modules, concatenated: module k owns
+    # edges[ptr[k]:ptr[k + 1]] (the layout the fused kernel expects)
+    edges = [arr.module_internal_conn_idx[mod.id] for mod in arr.hebbian_modules]
+    ptr = np.zeros(len(edges) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in edges], out=ptr[1:])
+    return ptr, np.concatenate([np.zeros(0, dtype=np.int64), *edges])
+
+
+def _noise_period(freq: float) -> int:
+    freq = freq or 1.0
+    if freq >= 1:
+        return 1
+    period = round(1 / freq)
+    if period == 0: period = 1
+    return period
+
+
+def _lif_tick_numpy(pot, act, refr, refr_period, thr, decay, bias, input_sum,
+                    is_firing, is_pulse, rand_u, idx):
+    """
+    Vectorized LIF update of the nodes in `idx`. Returns the number firing.
+    Every phase runs over all of `idx` with np.where masks (refractory nodes
+    add 0 and scale by 1) instead of compacting subsets with boolean indexing.
+    """
+    p = pot[idx]
+    th = thr[idx]
+    pulse = is_pulse[idx]
+
+    # 0. Refractory Period
+    # PULSE nodes get hard reset in refractory (TS logic)
+    in_refr = refr[idx] > 0
+    active = ~in_refr
+    p = np.where(in_refr & pulse, np.float32(0.0), p)
+    r = refr[idx] - in_refr
+
+    # 1. Add Input and Bias
+    p += np.where(active, input_sum[idx] + bias[idx], 0.0)
+
+    # 2. Check Firing
+    fire = active & (p >= th)
+
+    # Refractory + Jitter
+    jitter = rand_u < 0.5
+    r = np.where(fire, refr_period[idx] + jitter, r)
+
+    # Soft Reset: Subtract threshold, preserving "overcharge"
+    # SUSTAINED: Keep potential (it maintains state)
+    p -= np.where(fire & pulse, th, np.float32(0.0))
+
+    # 3. Decay
+    p *= np.where(active, 1.0 - decay[idx], np.float32(1.0))
+
+    # 4. Clamp / Floor
+    # Clamp Max (from TS: threshold * 4.0)
+    p = np.where(active, np.minimum(np.maximum(p, 0.0), th * 4.0), p)
+
+    pot[idx] = p
+    refr[idx] = r
+    is_firing[idx] = fire
+    act[idx] = fire
+    return int(np.count_nonzero(fire))
+
+
+def _lif_tick_scalar(pot, act, refr, refr_period, thr, decay, bias, input_sum,
+                     is_firing, is_pulse, rand_u, idx):
+    """Scalar LIF update of the nodes in `idx`, compiled with Numba."""
+    n_firing = 0
+    for j in range(idx.shape[0]):
+        i = idx[j]
+
+        # 0. Refractory Period
+        if refr[i] > 0:
+            refr[i] -= 1
+            is_firing[i] = 0
+            act[i] = 0.0
+            # PULSE nodes get hard reset in refractory (TS logic)
+            if is_pulse[i]:
+                pot[i] = 0.0
+            continue
+
+        # 1. Add Input and Bias
+        p = pot[i] + input_sum[i] + bias[i]
+
+        # 2. Check Firing
+        if p >= thr[i]:
+            is_firing[i] = 1
+            act[i] = 1.0
+            n_firing += 1
+
+            # Refractory + Jitter
+            jitter = 1 if rand_u[j] < 0.5 else 0
+            refr[i] = refr_period[i] + jitter
+
+            if is_pulse[i]:
+                # Soft Reset: Subtract threshold, preserving "overcharge"
+                p -= thr[i]
+            # SUSTAINED: Keep potential (it maintains state)
+        else:
+            is_firing[i] = 0
+            act[i] = 0.0
+
+        # 3. Decay
+        p *= (1.0 - decay[i])
+
+        # 4. Clamp / Floor
+        if p < 0: p = 0.0
+
+        # Clamp Max (from TS: threshold * 4.0)
+        max_pot = thr[i] * 4.0
+        if p > max_pot: p = max_pot
+        pot[i] = p
+    return n_firing
+
+
+if njit is not None:
+    _lif_tick = njit(fastmath=True, cache=True)(_lif_tick_scalar)
+else:
+    _lif_tick = _lif_tick_numpy
+
+
+# Imported after _lif_tick, which engine_numba builds its kernel on
+try:
+    from .engine_numba import run_batch as _run_batch
+except ImportError:  # No Numba: step_batch runs one step() per tick
+    _run_batch = None
+
 
 class Engine:
-    def __init__(self, net: NeuralNet):
+    def __init__(self, net: NeuralNet, debug: bool = False):
         self.net = net
+        self.debug = debug
+        self._arrays: Optional[NetArrays] = None
+        self._step_fn: Optional[Callable[[], Tuple[int, np.ndarray]]] = None
+        self._firing_count = 0 # Nodes that fired during the last step
+        self._rand_pool = np.empty(0, dtype=np.float32)
+        self._rand_cursor = 0
+        self._held = np.zeros(0, dtype=np.int64) # See hold_inputs
+
+    def invalidate(self):
+        """
+        Drop the materialized arrays so they are rebuilt on the next step.
+        Call this after changing topology, node configuration (threshold,
+        decay, activationType, ...) or a module's hebbianLearning flag
+        outside of the engine. Learned weights are flushed to wherever their
+        connections now sit, so it is safe after add/remove_connections.
+        """
+        self.flush()
+        self._arrays = None
+
+    def flush(self):
+        """
+        Write the engine's float32 connection state back to the net's arrays.
+        Steps only update the engine's copy, so Connection.weight /
+        signalStrength, to_json() and save_npz() see learned weights only
+        after a flush; every save path calls this first.
+        """
+        arr = self._arrays
+        if arr is None:
+            return
+        # Only values the engine changed, so edits made on the net since the
+        # last sync survive
+        changed_w = arr.weight != arr.synced_weight
+        changed_s = arr.signal_strength != arr.synced_signal
+        if not (changed_w.any() or changed_s.any()):
+            return
+        net = self.net
+        if net.conn_version == arr.conn_version:
+            pos = arr.conn_pos
+        else:
+            # Connections were removed or reloaded outside the engine: locate
+            # the edges again, skipping the ones no longer in this net
+            pos = np.array([c._idx if c._net is net else -1 for c in arr.conns], dtype=np.int64)
+            changed_w &= pos >= 0
+            changed_s &= pos >= 0
+        net.conn_weight[pos[changed_w]] = arr.weight[changed_w]
+        net.conn_signal[pos[changed_s]] = arr.signal_strength[changed_s]
+        np.copyto(arr.synced_weight, arr.weight)
+        np.copyto(arr.synced_signal, arr.signal_strength)
+
+    def _materialize(self) -> NetArrays:
+        # Same order as the net's state arrays
+        nodes = list(self.net.nodes.values())
+        node_ids = [n.id for n in nodes]
+        index = self.net.node_index
+        n = len(nodes)
+
+        # Only connections whose endpoints both exist are materialized
+        conn_pos = np.flatnonzero((self.net.conn_src >= 0) & (self.net.conn_tgt >= 0))
+        src = self.net.conn_src[conn_pos]
+        tgt = self.net.conn_tgt[conn_pos]
+
+        # Normalization Logic (Group by Source Brain Module)
+        # Inputs a node receives from an external BRAIN module are averaged
+        # per source module. Tag each such edge with its source module index
+        # (-1 for standard edges).
+        mod_index = {mod_id: k for k, mod_id in enumerate(self.net.modules)}
+        is_brain_mod = np.array([m.type == 'BRAIN' for m in self.net.modules.values()] + [False], dtype=bool)
+        node_mod_idx = np.array([mod_index.get(self.net.nodeModuleMap.get(nid), -1) for nid in node_ids],
+                                dtype=np.int32)
+        src_mod_idx = node_mod_idx[src]
+        tgt_mod_idx = node_mod_idx[tgt]
+        # Index -1 (no module) hits the trailing False in is_brain_mod
+        is_external_brain_edge = (src_mod_idx != tgt_mod_idx) & is_brain_mod[src_mod_idx]
+        brain_mod = np.where(is_external_brain_edge, src_mod_idx, -1)
+
+        # Sort edges by (target, source brain module). Standard edges sort
+        # first within a target and keep their connection order, and every
+        # (target, module) group becomes a contiguous run.
+        brain_mod_arr = brain_mod.astype(np.int32)
+        order = np.lexsort((brain_mod_arr, tgt))
+        conn_pos_arr = conn_pos[order]
+        src_idx = src[order]
+        tgt_idx = tgt[order]
+        brain_mod_arr = brain_mod_arr[order]
+
+        is_input = np.array([nd.type == 'INPUT' for nd in nodes], dtype=bool)
+        weight = self.net.conn_weight[conn_pos_arr].astype(np.float32)
+        signal_strength = self.net.conn_signal[conn_pos_arr].astype(np.float32)
+
+        # Internal edges per learning BRAIN module (both endpoint ids carry the module prefix)
+        hebbian_modules = [m for m in self.net.modules.values()
+                           if m.type == 'BRAIN' and getattr(m, 'hebbianLearning', False)]
+        module_internal_conn_idx: Dict[str, np.ndarray] = {}
+        for mod in hebbian_modules:
+            in_mod = np.array([nid.startswith(mod.id) for nid in node_ids], dtype=bool)
+            module_internal_conn_idx[mod.id] = np.flatnonzero(in_mod[src_idx] & in_mod[tgt_idx])
+
+        input_nodes = [nd for nd in nodes if nd.type == 'INPUT']
+        input_sin_nodes = [nd for nd in input_nodes if nd.inputType == 'SIN']
+        input_noise_nodes = [nd for nd in input_nodes if nd.inputType == 'NOISE']
+        input_pulse_nodes = [nd for nd in input_nodes if nd.inputType not in ('SIN', 'NOISE')]
+        compute_idx = np.flatnonzero(~is_input)
+
+        return NetArrays(
+            node_ids=node_ids,
+            index=index,
+            nodes=nodes,
+            compute_idx=compute_idx,
+            input_sin_nodes=input_sin_nodes,
+            sin_idx=np.array([index[nd.id] for nd in input_sin_nodes], dtype=np.int64),
+            sin_freqs=np.array([(nd.inputFrequency or 1.0) * 0.1 for nd in input_sin_nodes]),
+            input_noise_nodes=input_noise_nodes,
+            noise_idx=np.array([index[nd.id] for nd in input_noise_nodes], dtype=np.int64),
+            noise_periods=np.array([_noise_period(nd.inputFrequency) for nd in input_noise_nodes],
+                                   dtype=np.int64),
+            input_pulse_nodes=input_pulse_nodes,
+            pulse_idx=np.array([index[nd.id] for nd in input_pulse_nodes], dtype=np.int64),
+            pulse_cleanup_nodes=[nd for nd in nodes
+                                 if nd.type in ('INPUT', 'CONCEPT') and nd.inputType == 'PULSE'],
+            thr=self.net.threshold.astype(np.float32),
+            decay=self.net.decay.astype(np.float32),
+            bias=self.net.bias.astype(np.float32),
+            is_pulse=np.array([nd.activationType == 'PULSE' for nd in nodes], dtype=bool),
+            conn_pos=conn_pos_arr,
+            src_idx=src_idx,
+            tgt_idx=tgt_idx,
+            brain_mod=brain_mod_arr,
+            weight=weight,
+            signal_strength=signal_strength,
+            sig_mask=~is_input[tgt_idx],
+            conns=[self.net.connections[pos] for pos in conn_pos_arr.tolist()],
+            conn_version=self.net.conn_version,
+            synced_weight=weight.copy(),
+            synced_signal=signal_strength.copy(),
+            hebbian_modules=hebbian_modules,
+            module_internal_conn_idx=module_internal_conn_idx,
+            **_edge_index(n, src_idx, tgt_idx, brain_mod_arr, weight),
+        )
+
+    def _remove_edges(self, arr: NetArrays, edges: np.ndarray):
+        """
+        Drop the given materialized edges from the arrays, net.connections and
+        net.incoming without re-materializing the whole network.
+        """
+        keep = np.ones(len(arr.conn_pos), dtype=bool)
+        keep[edges] = False
+
+        # net.connections / net.incoming / the net's connection arrays
+        removed_pos = np.sort(arr.conn_pos[edges])
+        self.flush()
+        self.net.remove_connections(removed_pos)
+        arr.conn_version = self.net.conn_version # conn_pos is remapped below
+
+        # Edge arrays: compact, then shift positions / indices past removed entries
+        conn_pos = arr.conn_pos[keep]
+        arr.conn_pos = conn_pos - np.searchsorted(removed_pos, conn_pos)
+        arr.src_idx = arr.src_idx[keep]
+        arr.tgt_idx = arr.tgt_idx[keep]
+        arr.brain_mod = arr.brain_mod[keep]
+        arr.weight = arr.weight[keep]
+        arr.signal_strength = arr.signal_strength[keep]
+        arr.sig_mask = arr.sig_mask[keep]
+        arr.conns = [c for c, k in zip(arr.conns, keep.tolist()) if k]
+        arr.synced_weight = arr.synced_weight[keep]
+        arr.synced_signal = arr.synced_signal[keep]
+
+        new_index = np.cumsum(keep) - 1
+        for mod_id, idx in arr.module_internal_conn_idx.items():
+            arr.module_internal_conn_idx[mod_id] = new_index[idx[keep[idx]]]
+
+        # Group counts change when a group loses edges, so re-derive them
+        for name, value in _edge_index(len(arr.nodes), arr.src_idx, arr.tgt_idx,
+                                       arr.brain_mod, arr.weight).items():
+            setattr(arr, name, value)
+        arr.weights_dirty = False
+
+    def hold_inputs(self, idx: Optional[np.ndarray]):
+        """
+        Sustain the nodes at the given state-array indices: their activation
+        is set back to 1 (firing) at the start of every tick, before any
+        input is read, until released with hold_inputs(None).
+        """
+        self._held = np.zeros(0, dtype=np.int64) if idx is None else np.asarray(idx, dtype=np.int64)
+
+    def _ensure_arrays(self):
+        # (Re)build the arrays and tick function after creation or invalidate()
+        if self._arrays is None:
+            self._arrays = self._materialize()
+            self._step_fn = self._specialize(self._arrays)
 
     def step(self):
         self.net.tickCount += 1
-        input_sums: Dict[str, float] = {}
-
-        # 1. Process INPUT Nodes
-        for node in self.net.nodes.values():
-            if node.type == 'INPUT':
-                self._update_input_node(node)
-                # Input nodes fire based on activation in update_input_node or existing logic
-                node.isFiring = node.activation > 0.5
-        
-        # 2. Calculate Inputs for Non-Input Nodes
-        # We iterate over all nodes to calculate what they RECEIVE.
-        # Alternatively, iterate connections. But calculating per node is easier for normalization.
-        
-        for node in self.net.nodes.values():
-            if node.type == 'INPUT':
-                continue
-            
-            incoming = self.net.incoming.get(node.id, [])
-            if not incoming:
-                input_sums[node.id] = 0.0
-                continue
-                
-            total_sum = 0.0
-            
-            # Normalization Logic (Group by Source Brain Module)
-            # Map<SourceModuleId, List<{conn, rawSignal}>>
-            brain_inputs: Dict[str, List[Tuple[Connection, float]]] = {}
-            
-            target_mod_id = self.net.nodeModuleMap.get(node.id)
-            
-            for conn in incoming:
-                source_node = self.net.nodes.get(conn.sourceId)
-                if not source_node:
-                    continue
-                
-                # Calculate Raw Signal
-                # Note: In TS, sourceNode.activation is used.
-                raw_signal = source_node.activation * conn.weight
-                
-                source_mod_id = self.net.nodeModuleMap.get(source_node.id)
-                
-                is_external_brain = False
-                if source_mod_id and source_mod_id != target_mod_id:
-                    source_mod = self.net.modules.get(source_mod_id)
-                    if source_mod and source_mod.type == 'BRAIN':
-                        is_external_brain = True
-                
-                if is_external_brain and source_mod_id:
-                    if source_mod_id not in brain_inputs:
-                        brain_inputs[source_mod_id] = []
-                    brain_inputs[source_mod_id].append((conn, raw_signal))
-                else:
-                    # Standard Processing
-                    total_sum += raw_signal
-                    conn.signalStrength = abs(raw_signal)
-            
-            # Process Brain Inputs (Normalized)
-            for mod_id, entries in brain_inputs.items():
-                count = len(entries)
-                if count > 0:
-                    norm_factor = 1.0 / count
-                    for conn, raw_val in entries:
-                        normalized = raw_val * norm_factor
-                        total_sum += normalized
-                        # Visual strength uses raw
-                        conn.signalStrength = abs(raw_val)
-            
-            input_sums[node.id] = total_sum
+        self._ensure_arrays()
+        if self._held.size:
+            self.net.act[self._held] = 1.0
+            self.net.firing[self._held] = True
+        self._firing_count, input_sums = self._step_fn()
 
-        # 3. Update Nodes
-        for node in self.net.nodes.values():
-            if node.type == 'INPUT':
-                continue # Already updated
-            
-            val = input_sums.get(node.id, 0.0)
-            self._update_node(node, val)
-
-        # 4. Hebbian Learning (Simplified Port)
-        # Only if enabled.
-        if self.net.modules:
-            for mod in self.net.modules.values():
-                if mod.type == 'BRAIN' and hasattr(mod, 'hebbianLearning') and mod.hebbianLearning:
+        # Debug Prints (only walk the nodes when something fired)
+        if self.debug and self._firing_count > 0:
+            self._print_debug(self._arrays, input_sums)
+
+    def step_batch(self, count: int):
+        """
+        Run `count` ticks. Uses the fused kernel in engine_numba when Numba
+        is available and debug output is off; otherwise equivalent to
+        calling step() `count` times.
+        """
+        self._ensure_arrays()
+        arr = self._arrays
+        if count <= 0:
+            return
+        if _run_batch is None or self.debug:
+            for _ in range(count):
+                self.step()
+            return
+
+        net = self.net
+        n_draws, cleanup_idx = self._kernel_schedule(arr)
+        # Ticks per kernel call, bounded so the pre-drawn randoms stay small
+        chunk = max(1, BATCH_RAND_LIMIT // max(n_draws, 1))
+        heb_params = [_hebbian_params(mod) for mod in arr.hebbian_modules]
+        heb_rate = np.array([rate for rate, _ in heb_params], dtype=np.float32)
+        heb_prune = np.array([thresh for _, thresh in heb_params], dtype=np.float32)
+        input_sum = np.empty(len(arr.nodes), dtype=np.float32)
+        while count > 0:
+            # Re-read after every prune, which compacts the edge arrays
+            w_norm = np.multiply(arr.weight, arr.norm, dtype=np.float32)
+            heb_ptr, heb_edges = _hebbian_edges(arr)
+
+            ticks = min(count, chunk)
+            done, self._firing_count, stop = _run_batch(
+                ticks, net.tickCount, net.pot, net.act, net.refr, net.refr_period, net.firing,
+                arr.thr, arr.decay, arr.bias, arr.is_pulse,
+                arr.indptr, arr.src_idx, arr.tgt_idx, arr.norm, w_norm, arr.weight,
+                arr.sig_mask, arr.signal_strength,
+                self._held, arr.sin_idx, arr.sin_freqs, arr.noise_idx, arr.noise_periods, arr.pulse_idx,
+                heb_ptr, heb_edges, heb_rate, heb_prune,
+                arr.compute_idx, cleanup_idx, self._draw_uniform(ticks * n_draws), input_sum)
+            net.tickCount += done
+            count -= done
+            if heb_params:
+                arr.weights_dirty = True
+            if stop >= 0:
+                # Hand back the randoms of the ticks not run, then finish the
+                # stopped tick: prune, remaining Hebbian modules, cleanup
+                self._rand_cursor -= (ticks - done) * n_draws
+                self._prune_module(arr, arr.hebbian_modules[stop])
+                for mod in arr.hebbian_modules[stop + 1:]:
                     self._process_hebbian(mod)
+                if arr.pulse_cleanup_nodes:
+                    self._post_step_cleanup()
 
-        # 5. Cleanup Manual Pulses
-        self._post_step_cleanup()
-        
-        # Debug Prints
-        active_inputs = [n.id for n in self.net.nodes.values() if n.type in ('INPUT', 'CONCEPT') and n.isFiring]
-        firing_nodes = [n.id for n in self.net.nodes.values() if n.type not in ('INPUT', 'CONCEPT') and n.isFiring]
+    def _kernel_schedule(self, arr: NetArrays) -> Tuple[int, np.ndarray]:
+        # For run_batch: uniforms drawn per tick (noise samples, then one per
+        # compute node) and the manual PULSE inputs reset after every tick
+        n_draws = len(arr.input_noise_nodes) + len(arr.compute_idx)
+        cleanup_idx = np.array([arr.index[nd.id] for nd in arr.pulse_cleanup_nodes
+                                if nd.activationType == 'PULSE'], dtype=np.int64)
+        return n_draws, cleanup_idx
+
+    @property
+    def parallel_supported(self) -> bool:
+        """Whether run_parallel can be used (Numba available, no debug output)."""
+        return _run_batch is not None and not self.debug
+
+    def run_parallel(self, fire_idx: List[np.ndarray], count: int, workers: int,
+                     sustain: bool = False):
+        """
+        Mini-batch mode: for each index array in `fire_idx`, set those nodes
+        firing and run `count` ticks. All runs start from the current state
+        on independent copies of the node state and weights, up to `workers`
+        at a time (the fused kernel releases the GIL). Runs are laid out one
+        after another in tick time. Their Hebbian weight changes are summed
+        into the shared weights and pruned once at the end, and the net keeps
+        the node state of the last run. With `sustain`, each run holds its
+        nodes (see hold_inputs) for all of its ticks. Requires
+        parallel_supported.
+        """
+        self._ensure_arrays()
+        arr = self._arrays
+        net = self.net
+        if not fire_idx or count <= 0:
+            return
+
+        n_draws, cleanup_idx = self._kernel_schedule(arr)
+        heb_rate = np.array([_hebbian_params(mod)[0] for mod in arr.hebbian_modules], dtype=np.float32)
+        # Pruning waits for the summed weights, so the kernel never stops early
+        heb_prune = np.full(len(heb_rate), -1.0, dtype=np.float32)
+        heb_ptr, heb_edges = _hebbian_edges(arr)
+        w0 = arr.weight
+        w_norm0 = np.multiply(w0, arr.norm, dtype=np.float32)
+        state = (net.pot, net.act, net.refr, net.firing)
+
+        def run(b: int, idx: np.ndarray, rand_u: np.ndarray):
+            pot, act, refr, firing = (a.copy() for a in state)
+            act[idx] = 1.0
+            pot[idx] = 1.0
+            firing[idx] = True
+            weight, w_norm = w0.copy(), w_norm0.copy()
+            signal = arr.signal_strength.copy()
+            _run_batch(count, net.tickCount + b * count, pot, act, refr, net.refr_period, firing,
+                       arr.thr, arr.decay, arr.bias, arr.is_pulse,
+                       arr.indptr, arr.src_idx, arr.tgt_idx, arr.norm, w_norm, weight,
+                       arr.sig_mask, signal,
+                       idx if sustain else self._held,
+                       arr.sin_idx, arr.sin_freqs, arr.noise_idx, arr.noise_periods, arr.pulse_idx,
+                       heb_ptr, heb_edges, heb_rate, heb_prune,
+                       arr.compute_idx, cleanup_idx, rand_u, np.empty(len(arr.nodes), dtype=np.float32))
+            return (pot, act, refr, firing), weight, signal
+
+        draws = [self._draw_uniform(count * n_draws) for _ in fire_idx]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, range(len(fire_idx)), fire_idx, draws))
+
+        last_state, _, last_signal = results[-1]
+        for dst, src in zip(state, last_state):
+            dst[:] = src
+        arr.signal_strength[:] = last_signal
+        if arr.hebbian_modules:
+            delta = np.zeros(len(w0), dtype=np.float32)
+            for _, weight, _ in results:
+                delta += weight - w0
+            np.minimum(w0 + delta, np.float32(2.0), out=arr.weight)
+            arr.weights_dirty = True
+            for mod in arr.hebbian_modules:
+                self._prune_module(arr, mod)
+        net.tickCount += len(fire_idx) * count
+        self._firing_count = int(np.count_nonzero(net.firing))
+
+    def _specialize(self, arr: NetArrays) -> Callable[[], Tuple[int, np.ndarray]]:
+        """
+        Build the tick function for the current topology. Phases with nothing
+        to do on this network (an input kind with no nodes, learning with no
+        Hebbian module, cleanup with no manual pulses) are left out, and the
+        remaining ones are bound once instead of being looked up every tick.
+        Rebuilt whenever the arrays are re-materialized.
+        """
+        input_phases = []
+        if arr.input_sin_nodes:
+            input_phases.append(self._update_sin_inputs)
+        if arr.input_noise_nodes:
+            input_phases.append(self._update_noise_inputs)
+        if arr.input_pulse_nodes:
+            input_phases.append(self._update_pulse_inputs)
+        input_phases = tuple(input_phases)
+        learn_phases = tuple(partial(self._process_hebbian, mod) for mod in arr.hebbian_modules)
+        cleanup = self._post_step_cleanup if arr.pulse_cleanup_nodes else None
+        accumulate, update_nodes = self._accumulate_inputs, self._update_nodes
+
+        def step_specialized() -> Tuple[int, np.ndarray]:
+            # 1. Process INPUT Nodes
+            n_firing = 0
+            for update_inputs in input_phases:
+                n_firing += update_inputs(arr)
+
+            # 2. Calculate Inputs for Non-Input Nodes
+            input_sums = accumulate(arr)
+
+            # 3. Update Nodes
+            n_firing += update_nodes(arr, input_sums)
+
+            # 4. Hebbian Learning (Simplified Port)
+            # Only if enabled.
+            for learn in learn_phases:
+                learn()
+
+            # 5. Cleanup Manual Pulses
+            if cleanup is not None:
+                cleanup()
+            return n_firing, input_sums
+
+        return step_specialized
+
+    def _print_debug(self, arr: NetArrays, input_sums: np.ndarray):
+        firing = self.net.firing
+        active_inputs = [n.id for n in arr.nodes if n.type in ('INPUT', 'CONCEPT') and firing[n._idx]]
+        firing_nodes = [n.id for n in arr.nodes if n.type not in ('INPUT', 'CONCEPT') and firing[n._idx]]
         if active_inputs or firing_nodes:
             print(f"Tick {self.net.tickCount}: Active Inputs={active_inputs}, Firing={firing_nodes}")
             
             # Check sums for debugging
-            non_zero_sums = {k: v for k, v in input_sums.items() if v > 0}
+            non_zero_sums = {arr.node_ids[i]: float(input_sums[i]) for i in arr.compute_idx if input_sums[i] > 0}
             if non_zero_sums:
                 print(f"  Input Sums: {non_zero_sums}")
 
-    def _update_input_node(self, node: Node):
-        if node.inputType == 'SIN':
-            sin_freq = (node.inputFrequency or 1.0) * 0.1
-            node.activation = (math.sin(self.net.tickCount * sin_freq) + 1) / 2
-            node.potential = node.activation
-        
-        elif node.inputType == 'NOISE':
-            freq = node.inputFrequency or 1.0
-            if freq >= 1:
-                node.activation = random.random()
-            else:
-                period = round(1 / freq)
-                if period == 0: period = 1
-                if self.net.tickCount % period == 0:
-                    node.activation = random.random()
-            node.potential = node.activation
-        
-        elif node.inputType == 'PULSE':
-            # Manual Input
-            pass
+    def _accumulate_inputs(self, arr: NetArrays) -> np.ndarray:
+        n = len(arr.nodes)
+        act = self.net.act
+        active = np.flatnonzero(act)
+
+        if active.size < n * SPARSE_ACTIVITY_RATIO:
+            # Spike-driven: silent sources contribute nothing, so only walk
+            # the outgoing edges of the active ones.
+            starts = arr.out_ptr[active]
+            counts = arr.out_ptr[active + 1] - starts
+            offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+            edges = arr.out_order[offsets + np.arange(offsets.size)]
+
+            raw = act[arr.src_idx[edges]] * arr.weight[edges]
+            input_sums = np.bincount(arr.tgt_idx[edges], weights=raw * arr.norm[edges], minlength=n)
+            # Visual strength uses raw
+            arr.signal_strength[arr.sig_mask] = 0.0
+            arr.signal_strength[edges] = np.where(arr.sig_mask[edges], np.abs(raw), arr.signal_strength[edges])
+            return input_sums
+
+        # input_sums = W @ act, with external brain inputs pre-scaled by their
+        # group size in W. Without SciPy, gather per edge and scatter-add,
+        # averaging each brain group with a segmented sum.
+        raw = act[arr.src_idx] * arr.weight
+        if arr.w_csr is not None:
+            if arr.weights_dirty:
+                np.multiply(arr.weight, arr.norm, out=arr.w_csr.data)
+                arr.weights_dirty = False
+            input_sums = arr.w_csr @ act
+        else:
+            input_sums = np.bincount(arr.tgt_idx[arr.normal_edges], weights=raw[arr.normal_edges], minlength=n)
+            if arr.group_starts.size:
+                grouped_sums = np.add.reduceat(raw[arr.brain_edges], arr.group_starts)
+                input_sums += np.bincount(arr.group_tgt, weights=grouped_sums / arr.group_counts, minlength=n)
+        # Visual strength uses raw
+        np.abs(raw, out=arr.signal_strength, where=arr.sig_mask)
+        return input_sums
+
+    # Input nodes fire based on activation in update_input_node or existing logic.
+    # Each input phase returns the number of its nodes firing.
+
+    def _update_sin_inputs(self, arr: NetArrays) -> int:
+        sin_vals = 0.5 * (np.sin(self.net.tickCount * arr.sin_freqs) + 1.0)
+        self.net.act[arr.sin_idx] = sin_vals
+        self.net.pot[arr.sin_idx] = sin_vals
+        sin_firing = sin_vals > 0.5
+        self.net.firing[arr.sin_idx] = sin_firing
+        return int(np.count_nonzero(sin_firing))
+
+    def _update_noise_inputs(self, arr: NetArrays) -> int:
+        # Low-frequency noise only resamples every `period` ticks
+        act = self.net.act
+        due = (self.net.tickCount % arr.noise_periods) == 0
+        samples = self._draw_uniform(len(arr.input_noise_nodes))
+        noise_vals = np.where(due, samples, act[arr.noise_idx])
+        act[arr.noise_idx] = noise_vals
+        self.net.pot[arr.noise_idx] = noise_vals
+        noise_firing = noise_vals > 0.5
+        self.net.firing[arr.noise_idx] = noise_firing
+        return int(np.count_nonzero(noise_firing))
+
+    def _update_pulse_inputs(self, arr: NetArrays) -> int:
+        # Manual Input
+        pulse_firing = self.net.act[arr.pulse_idx] > 0.5
+        self.net.firing[arr.pulse_idx] = pulse_firing
+        return int(np.count_nonzero(pulse_firing))
 
     def _post_step_cleanup(self):
         # Reset Manual PULSE inputs that fired
-        for node in self.net.nodes.values():
-            if node.type in ('INPUT', 'CONCEPT') and node.inputType == 'PULSE':
-                if node.activationType == 'PULSE':
-                    node.activation = 0.0
-                    node.potential = 0.0
-                    node.isFiring = False
-
-    def _update_node(self, node: Node, input_sum: float):
-        # 0. Refractory Period
-        if node.refractoryTimer > 0:
-            node.refractoryTimer -= 1
-            node.isFiring = False
-            node.activation = 0.0
-            # PULSE nodes get hard reset in refractory (TS logic)
+        for node in self._arrays.pulse_cleanup_nodes:
             if node.activationType == 'PULSE':
+                node.activation = 0.0
                 node.potential = 0.0
-            return
+                node.isFiring = False
 
-        # 1. Add Input and Bias
-        node.potential += input_sum + node.bias
-        
-        # 2. Check Firing
-        if node.potential >= node.threshold:
-            node.isFiring = True
-            node.activation = 1.0
-            
-            # Refractory + Jitter
-            jitter = 1 if random.random() < 0.5 else 0
-            node.refractoryTimer = node.refractoryPeriod + jitter
-            
-            if node.activationType == 'PULSE':
-                # Soft Reset: Subtract threshold, preserving "overcharge"
-                node.potential -= node.threshold
-            # SUSTAINED: Keep potential (it maintains state)
-            
-        else:
-            node.isFiring = False
-            node.activation = 0.0
-            
-        # 3. Decay
-        node.potential *= (1.0 - node.decay)
-        
-        # 4. Clamp / Floor
-        if node.potential < 0: node.potential = 0.0
-        
-        # Clamp Max (from TS: threshold * 4.0)
-        max_pot = node.threshold * 4.0
-        if node.potential > max_pot: node.potential = max_pot
+    def _update_nodes(self, arr: NetArrays, input_sums: np.ndarray) -> int:
+        # LIF update over all non-input nodes in one kernel call
+        c = arr.compute_idx
+        rand_u = self._draw_uniform(len(c))
+        net = self.net
+        return _lif_tick(net.pot, net.act, net.refr, net.refr_period, arr.thr, arr.decay, arr.bias,
+                         input_sums, net.firing, arr.is_pulse, rand_u, c)
+
+    def _draw_uniform(self, n: int) -> np.ndarray:
+        # Hand out the next n values of the pre-drawn pool, refilling it when exhausted
+        if self._rand_cursor + n > len(self._rand_pool):
+            self._rand_pool = np.random.random(max(RAND_POOL_SIZE, n)).astype(np.float32)
+            self._rand_cursor = 0
+        u = self._rand_pool[self._rand_cursor:self._rand_cursor + n]
+        self._rand_cursor += n
+        return u
 
     def _process_hebbian(self, module):
         # Simplified copy of TS logic
-        # Filter connections internal to this module
-        # In Python, iterating all connections is slow.
-        # Ideally we should cache module-internal connections.
-        
-        rate = module.learningRate or 0.01
-        pruning_thresh = module.pruningThreshold if module.pruningThreshold is not None else 0.05
-        
-        # Naive iteration for now (Optimization target)
-        # To match TS exactly, we iterate connections.
-        # But TS has `this.connections` which is global.
+        # Operates on the module-internal edges cached at materialize time.
         
-        conns_to_remove = []
+        rate, _ = _hebbian_params(module)
         
-        prefix = module.id
+        arr = self._arrays
+        idx = arr.module_internal_conn_idx[module.id]
+        if not idx.size:
+            return
         
-        for conn in self.net.connections:
-            # Check if internal
-            if not (conn.sourceId.startswith(prefix) and conn.targetId.startswith(prefix)):
-                continue
-                
-            src = self.net.nodes.get(conn.sourceId)
-            tgt = self.net.nodes.get(conn.targetId)
-            
-            if src and tgt:
-                # Hebbian: delta = rate * src.act * tgt.act
-                delta = src.activation * tgt.activation * rate
-                
-                conn.weight += delta
-                if conn.weight > 2.0: conn.weight = 2.0
-                
-                if abs(conn.weight) < pruning_thresh:
-                    conns_to_remove.append(conn)
+        # Hebbian: delta = rate * src.act * tgt.act
+        act = self.net.act
+        deltas = act[arr.src_idx[idx]] * act[arr.tgt_idx[idx]] * rate
+        arr.weight[idx] = np.minimum(arr.weight[idx] + deltas, 2.0)
+        arr.weights_dirty = True
+        self._prune_module(arr, module)
+
+    def _prune_module(self, arr: NetArrays, module):
+        _, pruning_thresh = _hebbian_params(module)
+        idx = arr.module_internal_conn_idx[module.id]
+        prune_mask = np.abs(arr.weight[idx]) < pruning_thresh
         
         # Remove
-        if conns_to_remove:
-            for c in conns_to_remove:
-                if c in self.net.connections:
-                    self.net.connections.remove(c)
-            # Rebuild incoming map? Or just remove from list
-            self._rebuild_incoming()
-            
-    def _rebuild_incoming(self):
-        self.net.incoming.clear()
-        for conn in self.net.connections:
-            if conn.targetId not in self.net.incoming:
-                self.net.incoming[conn.targetId] = []
-            self.net.incoming[conn.targetId].append(conn)
+        if prune_mask.any():
+            self._remove_edges(arr, idx[prune_mask])
@@ -0,0 +1,70 @@
+"""
+Int8 inference variant of the engine (main.py --int8).
+
+Input sums are accumulated from int8 weights (NeuralNet.quantize, one scale
+per target module) and int8 activations (scale 1/127): the int8 x int8
+products fit in int16, row and brain-group sums are taken in wider integer
+accumulators and scaled back to float once per target. The LIF update,
+inputs and Hebbian learning are unchanged and run on the float state, so the
+only difference to Engine is the quantization error in the input sums.
+"""
+from typing import Optional
+
+import numpy as np
+
+from .engine import Engine, NetArrays
+from .model import _quantize_int8
+
+
+class Int8Engine(Engine):
+    def __init__(self, net, debug: bool = False):
+        super().__init__(net, debug=debug)
+        self._w_q: Optional[np.ndarray] = None       # int8 weight per edge (held as int16)
+        self._row_scale: Optional[np.ndarray] = None # Weight scale / 127 per target node
+        self._edge_group: Optional[np.ndarray] = None
+        self._group_pos: Optional[np.ndarray] = None # conn_pos the groups were taken for
+        self._n_groups = 0                               # Quantization groups (modules + 1)
+
+    def step_batch(self, count: int):
+        # The fused kernel accumulates float32 weights, so step tick by tick
+        for _ in range(count):
+            self.step()
+
+    @property
+    def parallel_supported(self) -> bool:
+        # run_parallel is built on the fused float32 kernel as well
+        return False
+
+    def _quantize_weights(self, arr: NetArrays):
+        # Same per-module scales as NeuralNet.quantize, taken from the
+        # engine's (possibly unflushed) weights
+        if self._group_pos is not arr.conn_pos:
+            _, conn_group, self._n_groups = self.net._quantization_groups()
+            self._edge_group = conn_group[arr.conn_pos]
+            self._group_pos = arr.conn_pos
+        w_q, w_scale = _quantize_int8(arr.weight, self._edge_group, self._n_groups)
+        self._w_q = w_q.astype(np.int16)
+        self._row_scale = np.zeros(len(arr.nodes), dtype=np.float32)
+        self._row_scale[arr.tgt_idx] = w_scale / 127
+        arr.weights_dirty = False
+
+    def _accumulate_inputs(self, arr: NetArrays) -> np.ndarray:
+        # Re-quantize after Hebbian updates or pruning changed the weights
+        if arr.weights_dirty or self._w_q is None or self._w_q.shape[0] != arr.weight.shape[0]:
+            self._quantize_weights(arr)
+        n = len(arr.nodes)
+        act = self.net.act
+        act_q = np.rint(np.clip(act, 0.0, 1.0) * 127).astype(np.int16)
+
+        # |w_q * act_q| <= 127 * 127, so the products fit in int16; the sums
+        # do not, so they are widened (bincount sums integers exactly in float64)
+        contrib = self._w_q * act_q[arr.src_idx]
+        q_sums = np.bincount(arr.tgt_idx[arr.normal_edges], weights=contrib[arr.normal_edges], minlength=n)
+        if arr.group_starts.size:
+            grouped_sums = np.add.reduceat(contrib[arr.brain_edges], arr.group_starts, dtype=np.int32)
+            q_sums += np.bincount(arr.group_tgt, weights=grouped_sums / arr.group_counts, minlength=n)
+        input_sums = (q_sums * self._row_scale).astype(np.float32)
+
+        # Visual strength uses the float weights
+        np.abs(act[arr.src_idx] * arr.weight, out=arr.signal_strength, where=arr.sig_mask)
+        return input_sums
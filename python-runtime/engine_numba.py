@@ -0,0 +1,106 @@
+"""
+Fused multi-tick kernel for Engine.step_batch.
+
+Runs a whole batch of ticks (inputs, accumulation, LIF update, Hebbian
+weight updates, pulse cleanup) in one compiled call on the engine's arrays.
+Pruning changes the topology, so the kernel stops as soon as a Hebbian
+update leaves an edge to prune and the engine finishes that tick in Python.
+Not used with debug output; importing this module fails without Numba and
+the engine then steps one tick at a time.
+"""
+import math
+
+import numpy as np
+from numba import njit
+
+from .engine import _lif_tick
+
+
+@njit(cache=True, nogil=True)
+def run_batch(count, tick0, pot, act, refr, refr_period, firing, thr, decay, bias, is_pulse,
+              indptr, src_idx, tgt_idx, norm, w_norm, weight, sig_mask, signal_strength,
+              held_idx, sin_idx, sin_freqs, noise_idx, noise_periods, pulse_idx,
+              heb_ptr, heb_edges, heb_rate, heb_prune,
+              compute_idx, cleanup_idx, rand_u, input_sum):
+    """
+    Advance `count` ticks starting after tick `tick0`. `rand_u` holds the
+    uniforms for every tick (noise samples, then one per compute node).
+    Nodes in `held_idx` are set firing at the start of every tick.
+    Hebbian module k owns the edges heb_edges[heb_ptr[k]:heb_ptr[k + 1]].
+    Returns (ticks run, nodes firing on the last of them, stop module): the
+    stop module is the Hebbian module whose update on the last tick left
+    edges below its pruning threshold (ending the batch early), else -1.
+    """
+    n_heb = heb_rate.shape[0]
+    n_noise = noise_idx.shape[0]
+    n_compute = compute_idx.shape[0]
+    r = 0
+    n_firing = 0
+    for t in range(count):
+        tick = tick0 + t + 1
+        n_firing = 0
+
+        # 0. Sustained inputs (Engine.hold_inputs)
+        for j in range(held_idx.shape[0]):
+            act[held_idx[j]] = 1.0
+            firing[held_idx[j]] = 1
+
+        # 1. Process INPUT Nodes
+        for j in range(sin_idx.shape[0]):
+            i = sin_idx[j]
+            v = 0.5 * (math.sin(tick * sin_freqs[j]) + 1.0)
+            act[i] = v
+            pot[i] = v
+            firing[i] = v > 0.5
+            n_firing += v > 0.5
+        for j in range(n_noise):
+            # Low-frequency noise only resamples every `period` ticks
+            i = noise_idx[j]
+            v = rand_u[r + j] if tick % noise_periods[j] == 0 else act[i]
+            act[i] = v
+            pot[i] = v
+            firing[i] = v > 0.5
+            n_firing += v > 0.5
+        r += n_noise
+        for j in range(pulse_idx.shape[0]):
+            i = pulse_idx[j]
+            firing[i] = act[i] > 0.5
+            n_firing += act[i] > 0.5
+
+        # 2. Calculate Inputs (rows of W = weight * norm, by target)
+        for i in range(indptr.shape[0] - 1):
+            s = np.float32(0.0)
+            for e in range(indptr[i], indptr[i + 1]):
+                s += act[src_idx[e]] * w_norm[e]
+            input_sum[i] = s
+        if t == count - 1 or n_heb:
+            # Visual strength uses raw; only the last tick is observable
+            # (with learning, any tick may end the batch)
+            for e in range(src_idx.shape[0]):
+                if sig_mask[e]:
+                    signal_strength[e] = abs(act[src_idx[e]] * weight[e])
+
+        # 3. Update Nodes
+        n_firing += _lif_tick(pot, act, refr, refr_period, thr, decay, bias, input_sum,
+                              firing, is_pulse, rand_u[r:r + n_compute], compute_idx)
+        r += n_compute
+
+        # 4. Hebbian Learning: delta = rate * src.act * tgt.act
+        for k in range(n_heb):
+            prune = False
+            for j in range(heb_ptr[k], heb_ptr[k + 1]):
+                e = heb_edges[j]
+                w = min(weight[e] + act[src_idx[e]] * act[tgt_idx[e]] * heb_rate[k], np.float32(2.0))
+                weight[e] = w
+                w_norm[e] = w * norm[e]
+                prune |= abs(w) < heb_prune[k]
+            if prune:
+                return t + 1, n_firing, k
+
+        # 5. Cleanup Manual Pulses
+        for j in range(cleanup_idx.shape[0]):
+            i = cleanup_idx[j]
+            act[i] = 0.0
+            pot[i] = 0.0
+            firing[i] = 0
+    return count, n_firing, -1
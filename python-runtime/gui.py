@@ -1,9 +1,19 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import json
+import queue
+import threading
+import time
+import numpy as np
 from .model import NeuralNet
+from .jsonio import load_json, save_json
 from .engine import Engine
 
+IO_CELL = 28 # Pixel size of one node cell in the I/O grids
+IO_COLS = 8
+IO_POOL_MAX = 32 # Module panels kept around for reuse by the next rebuild
+WORKER_BATCH = 20 # Ticks per engine call while playing with no delay
+REFRESH_MS = 33   # GUI polling interval for new simulation results (~30 fps)
+
 class NeuralGUI:
     def __init__(self, root):
         self.root = root
@@ -14,7 +24,29 @@ class NeuralGUI:
         self.engine = Engine(self.net)
         
         self.is_running = False
-        self.io_widgets = {} # node_id -> widget
+        # Simulation runs on a worker thread while playing. The worker never
+        # touches Tk; it publishes the tick count and executes GUI edits
+        # queued through _run_on_engine between steps.
+        self._worker = None
+        self._stop_event = threading.Event()
+        self._engine_jobs = queue.Queue()
+        self._sim_tick = threading.Event() # Set by the worker after each batch
+        self._latest_ticks = 0
+        self._worker_error = None # Exception that stopped the worker, reported by _refresh_stats
+        self._delay_ms = 50
+        self.io_widgets = {} # node_id -> (canvas, rect item, text item, 'input' | 'output')
+        # Parallel to io_widgets: node index, output flag and last drawn state code
+        self._io_idx = np.zeros(0, dtype=np.int64)
+        self._io_is_output = np.zeros(0, dtype=bool)
+        self._prev_colors = np.zeros(0, dtype=np.int32)
+        self._io_entries = [] # (node, canvas, rect item, text item)
+        self._dirty_viz = False # State changed while the I/O tab was hidden
+        # Stats/visual redraws are limited to one per REFRESH_MS; a skipped
+        # redraw is caught up by the pending `after` callback
+        self._last_ui_update = 0.0
+        self._ui_pending = None
+        self._io_panels = [] # (frame, canvas) per shown I/O module
+        self._io_pool = []   # Released panels, reused instead of recreated
         self.selected_module_id = None
 
         self._setup_layout()
@@ -36,6 +68,7 @@ class NeuralGUI:
         # RIGHT: Tabs
         self.notebook = ttk.Notebook(self.paned)
         self.paned.add(self.notebook)
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
         
         # Tab 1: I/O Visualization
         self.frame_viz_container = tk.Frame(self.notebook, bg="#222")
@@ -72,36 +105,35 @@ class NeuralGUI:
         self.frame_mod_details.pack(side="left", fill="both", expand=True, padx=5)
         
         # Simple Form
-        self.mod_vars = {
-            "id": tk.StringVar(),
-            "type": tk.StringVar(),
-            "label": tk.StringVar(),
-            "decay": tk.DoubleVar(),
-            "threshold": tk.DoubleVar(),
-            "hebbian": tk.BooleanVar(),
-            "learningRate": tk.DoubleVar()
-        }
+        # Entries are read and written directly (no Tk variables / traces);
+        # only the checkbox keeps a variable.
+        self._mod_entries = {}
+        self.var_hebbian = tk.BooleanVar()
         
         row = 0
         for key in ["id", "type", "label"]:
             tk.Label(self.frame_mod_details, text=key.capitalize() + ":").grid(row=row, column=0, sticky="e", pady=2)
-            tk.Entry(self.frame_mod_details, textvariable=self.mod_vars[key], state="readonly").grid(row=row, column=1, sticky="w", pady=2)
+            self._mod_entries[key] = tk.Entry(self.frame_mod_details, state="readonly")
+            self._mod_entries[key].grid(row=row, column=1, sticky="w", pady=2)
             row += 1
             
         tk.Label(self.frame_mod_details, text="Decay (0-1):").grid(row=row, column=0, sticky="e", pady=2)
-        tk.Entry(self.frame_mod_details, textvariable=self.mod_vars["decay"]).grid(row=row, column=1, sticky="w", pady=2)
+        self._mod_entries["decay"] = tk.Entry(self.frame_mod_details)
+        self._mod_entries["decay"].grid(row=row, column=1, sticky="w", pady=2)
         row += 1
 
         tk.Label(self.frame_mod_details, text="Threshold:").grid(row=row, column=0, sticky="e", pady=2)
-        tk.Entry(self.frame_mod_details, textvariable=self.mod_vars["threshold"]).grid(row=row, column=1, sticky="w", pady=2)
+        self._mod_entries["threshold"] = tk.Entry(self.frame_mod_details)
+        self._mod_entries["threshold"].grid(row=row, column=1, sticky="w", pady=2)
         row += 1
         
         tk.Label(self.frame_mod_details, text="Hebbian Learning:").grid(row=row, column=0, sticky="e", pady=2)
-        tk.Checkbutton(self.frame_mod_details, variable=self.mod_vars["hebbian"]).grid(row=row, column=1, sticky="w", pady=2)
+        tk.Checkbutton(self.frame_mod_details, variable=self.var_hebbian).grid(row=row, column=1, sticky="w", pady=2)
         row += 1
         
         tk.Label(self.frame_mod_details, text="Learning Rate:").grid(row=row, column=0, sticky="e", pady=2)
-        tk.Entry(self.frame_mod_details, textvariable=self.mod_vars["learningRate"]).grid(row=row, column=1, sticky="w", pady=2)
+        self._mod_entries["learningRate"] = tk.Entry(self.frame_mod_details)
+        self._mod_entries["learningRate"].grid(row=row, column=1, sticky="w", pady=2)
         row += 1
         
         tk.Button(self.frame_mod_details, text="Apply Changes", command=self._apply_module_changes, bg="#ddddff").grid(row=row, column=1, sticky="e", pady=10)
@@ -127,8 +159,9 @@ class NeuralGUI:
         # Settings
         frame_settings = tk.LabelFrame(self.frame_controls, text="Speed (ms delay)", padx=5, pady=5)
         frame_settings.pack(fill="x", pady=5)
-        self.scale_speed = tk.Scale(frame_settings, from_=0, to=500, orient="horizontal")
-        self.scale_speed.set(50)
+        self.scale_speed = tk.Scale(frame_settings, from_=0, to=500, orient="horizontal",
+                                    command=self._on_speed_change)
+        self.scale_speed.set(self._delay_ms)
         self.scale_speed.pack(fill="x")
 
         # Stats
@@ -150,15 +183,15 @@ class NeuralGUI:
     def load_net(self):
         filepath = filedialog.askopenfilename(filetypes=[("JSON Files", "*.json")])
         if not filepath: return
+        if self.is_running: self.toggle_play()
         
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
+            data = load_json(filepath)
             self.net.from_json(data)
             self.engine = Engine(self.net)
             self._rebuild_io_viz()
             self._refresh_module_list()
-            self._update_stats()
+            self._update_stats(force=True)
             self.lbl_status.config(text=f"Loaded: {filepath.split('/')[-1]}", fg="green")
         except Exception as e:
             import traceback
@@ -168,61 +201,145 @@ class NeuralGUI:
     def save_net(self):
         filepath = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")])
         if not filepath: return
+        if self.is_running: self.toggle_play()
         
         try:
-            data = self.net.to_json()
-            with open(filepath, 'w') as f:
-                json.dump(data, f, indent=2)
+            self.engine.flush()
+            save_json(filepath, self.net.to_json())
             self.lbl_status.config(text=f"Saved: {filepath.split('/')[-1]}", fg="blue")
         except Exception as e:
             messagebox.showerror("Save Error", str(e))
 
     def reset_state(self):
-        for node in self.net.nodes.values():
-            node.reset()
-        self.net.tickCount = 0
-        self._update_stats()
+        def reset():
+            self.net.reset_state()
+            self.net.tickCount = 0
+        self._run_on_engine(reset)
+        self._update_stats(force=True)
         self.lbl_status.config(text="State Reset", fg="orange")
 
     def toggle_play(self):
         if self.is_running:
             self.is_running = False
+            self._stop_event.set()
+            self._worker.join()
+            self._worker = None
+            self._drain_engine_jobs()
             self.btn_play.config(text="▶ Play", bg="#ddffdd")
-            self.lbl_status.config(text="Paused")
+            # Report a worker failure here, whether or not a poll saw it first
+            error, self._worker_error = self._worker_error, None
+            if error is None:
+                self.lbl_status.config(text="Paused")
+            else:
+                self.lbl_status.config(text=f"Engine error: {error}", fg="red")
+            self._update_stats(force=True)
+            if error is not None:
+                messagebox.showerror("Engine Error", str(error))
         else:
             self.is_running = True
+            self._worker_error = None
+            self._stop_event.clear()
+            self._worker = threading.Thread(target=self._engine_worker, daemon=True)
+            self._worker.start()
             self.btn_play.config(text="⏸ Pause", bg="#ffdddd")
             self.lbl_status.config(text="Running...")
-            self.root.after(10, self._run_loop)
-
-    def _run_loop(self):
-        if not self.is_running: return
-        delay = self.scale_speed.get()
-        steps = 10 if delay == 0 else 1
-        self.step_many(steps)
+            self.root.after(REFRESH_MS, self._refresh_stats)
+
+    def _on_speed_change(self, value):
+        # Cached for the worker thread, which must not query Tk widgets
+        self._delay_ms = int(value)
+
+    def _engine_worker(self):
+        while not self._stop_event.is_set():
+            try:
+                self._drain_engine_jobs()
+                # One tick per delay period, or a whole batch when running flat out
+                self.engine.step_batch(1 if self._delay_ms else WORKER_BATCH)
+            except Exception as e:
+                # Stop here; the Tk thread pauses and shows the error
+                import traceback
+                traceback.print_exc()
+                self._worker_error = e
+                return
+            self._latest_ticks = self.net.tickCount
+            self._sim_tick.set()
+            if self._delay_ms:
+                self._stop_event.wait(self._delay_ms / 1000)
+
+    def _run_on_engine(self, job):
+        # While playing, net/engine mutations are applied by the worker between steps
         if self.is_running:
-            self.root.after(max(1, delay), self._run_loop)
+            self._engine_jobs.put(job)
+        else:
+            job()
+
+    def _drain_engine_jobs(self):
+        while True:
+            try:
+                job = self._engine_jobs.get_nowait()
+            except queue.Empty:
+                return
+            job()
+
+    def _refresh_stats(self):
+        # Redraw only when the worker produced new ticks since the last poll
+        if not self.is_running: return
+        if self._worker_error is not None:
+            self.toggle_play() # Joins the stopped worker and reports the error
+            return
+        if self._sim_tick.is_set():
+            self._sim_tick.clear()
+            self._update_stats(force=True) # Already paced by REFRESH_MS
+        self.root.after(REFRESH_MS, self._refresh_stats)
 
     def step_once(self):
-        self.engine.step()
-        self._update_stats()
+        self._run_on_engine(self.engine.step)
+        self._update_stats(force=True)
 
     def step_many(self, count):
-        for _ in range(count):
-            self.engine.step()
+        self._run_on_engine(lambda: self.engine.step_batch(count))
         self._update_stats()
 
-    def _update_stats(self):
-        self.lbl_ticks.config(text=f"Ticks: {self.net.tickCount}")
+    def _update_stats(self, force=False):
+        now = time.monotonic()
+        wait_ms = REFRESH_MS - (now - self._last_ui_update) * 1000
+        if not force and wait_ms > 0:
+            if self._ui_pending is None:
+                self._ui_pending = self.root.after(int(wait_ms) + 1, self._flush_stats)
+            return
+        if self._ui_pending is not None:
+            self.root.after_cancel(self._ui_pending)
+            self._ui_pending = None
+        self._last_ui_update = now
+        ticks = self._latest_ticks if self.is_running else self.net.tickCount
+        self.lbl_ticks.config(text=f"Ticks: {ticks}")
         self.lbl_nodes.config(text=f"Nodes: {len(self.net.nodes)}")
         self.lbl_modules.config(text=f"Modules: {len(self.net.modules)}")
-        self._update_visuals()
+        self._refresh_visuals()
+
+    def _flush_stats(self):
+        self._ui_pending = None
+        self._update_stats(force=True)
 
     # --- I/O Visualization ---
 
+    def _refresh_visuals(self):
+        # Redrawing hidden widgets is wasted Tk work; catch up when the tab is shown
+        self._dirty_viz = True
+        if self.notebook.select() == str(self.frame_viz_container):
+            self._update_visuals()
+            self._dirty_viz = False
+
+    def _on_tab_changed(self, event):
+        if self._dirty_viz: self._refresh_visuals()
+
     def _rebuild_io_viz(self):
-        for widget in self.frame_io.winfo_children(): widget.destroy()
+        self._release_io_panels()
+        pooled = {frame for frame, _ in self._io_pool}
+        for widget in self.frame_io.winfo_children():
+            if widget not in pooled: widget.destroy()
         self.io_widgets = {}
+        self._cache_io_index()
 
         io_modules = [m for m in self.net.modules.values() if m.type in ('INPUT', 'OUTPUT', 'LEARNED_OUTPUT', 'CONCEPT')]
         io_modules.sort(key=lambda m: (m.type, m.name or m.id))
@@ -232,67 +349,137 @@ class NeuralGUI:
             return
 
         for mod in io_modules:
-            frame_mod = tk.LabelFrame(self.frame_io, text=f"{mod.name} ({mod.type})", bg="#333", fg="#ddd", padx=5, pady=5)
-            frame_mod.pack(fill="x", padx=10, pady=5)
-            frame_nodes = tk.Frame(frame_mod, bg="#333")
-            frame_nodes.pack(fill="both", expand=True)
+            frame_mod, canvas = self._take_io_panel(f"{mod.name} ({mod.type})")
 
-            mod_nodes = [n for n in self.net.nodes.values() if self.net.nodeModuleMap.get(n.id) == mod.id]
-            try: mod_nodes.sort(key=lambda n: int(n.id.split('-')[-1]))
-            except: mod_nodes.sort(key=lambda n: n.id)
+            mod_nodes = [self.net.nodes[nid] for nid in self.net.sortedModuleNodes.get(mod.id, [])]
 
             if not mod_nodes:
-                tk.Label(frame_nodes, text="(No Nodes)", bg="#333", fg="#555").pack()
+                tk.Label(frame_mod, text="(No Nodes)", bg="#333", fg="#555").pack()
                 continue
-                
-            cols = 8
+
+            # One canvas per module, one rectangle per node (clicks are hit-tested)
+            rows = (len(mod_nodes) + IO_COLS - 1) // IO_COLS
+            canvas.configure(width=IO_COLS * IO_CELL, height=rows * IO_CELL)
+            canvas.pack(anchor="w")
+            is_input = mod.type == 'INPUT' or mod.type == 'CONCEPT'
             for i, node in enumerate(mod_nodes):
-                row = i // cols
-                col = i % cols
-                if mod.type == 'INPUT' or mod.type == 'CONCEPT':
-                    btn = tk.Button(frame_nodes, text="O", width=2, height=1, bg="#444", fg="#fff", borderwidth=1)
-                    btn.bind("<Button-1>", lambda e, n=node: self.input_action(n, "pulse"))
-                    btn.bind("<Button-3>", lambda e, n=node: self.input_action(n, "toggle"))
-                    btn.grid(row=row, column=col, padx=2, pady=2)
-                    self.io_widgets[node.id] = (btn, 'input')
+                x, y = (i % IO_COLS) * IO_CELL, (i // IO_COLS) * IO_CELL
+                if is_input:
+                    rect = canvas.create_rectangle(x + 2, y + 2, x + IO_CELL - 2, y + IO_CELL - 2,
+                                                   fill="#444", outline="#666")
+                    text = canvas.create_text(x + IO_CELL // 2, y + IO_CELL // 2, text="O", fill="#fff")
+                    self.io_widgets[node.id] = (canvas, rect, text, 'input')
                 else:
-                    lbl = tk.Label(frame_nodes, text="", width=4, height=2, bg="#000", relief="sunken", borderwidth=1)
-                    lbl.grid(row=row, column=col, padx=2, pady=2)
-                    self.io_widgets[node.id] = (lbl, 'output')
+                    rect = canvas.create_rectangle(x + 2, y + 2, x + IO_CELL - 2, y + IO_CELL - 2,
+                                                   fill="#000", outline="#111")
+                    self.io_widgets[node.id] = (canvas, rect, None, 'output')
+            if is_input:
+                canvas.bind("<Button-1>", lambda e, nodes=mod_nodes: self._on_io_click(e, nodes, "pulse"))
+                canvas.bind("<Button-3>", lambda e, nodes=mod_nodes: self._on_io_click(e, nodes, "toggle"))
+
+        self._cache_io_index()
+
+    def _take_io_panel(self, title):
+        if self._io_pool:
+            frame, canvas = self._io_pool.pop()
+            frame.configure(text=title)
+        else:
+            frame = tk.LabelFrame(self.frame_io, text=title, bg="#333", fg="#ddd", padx=5, pady=5)
+            canvas = tk.Canvas(frame, bg="#333", highlightthickness=0)
+        frame.pack(fill="x", padx=10, pady=5)
+        self._io_panels.append((frame, canvas))
+        return frame, canvas
+
+    def _release_io_panels(self):
+        for frame, canvas in self._io_panels:
+            for child in frame.winfo_children():
+                if child is not canvas: child.destroy()
+            canvas.delete("all")
+            canvas.unbind("<Button-1>")
+            canvas.unbind("<Button-3>")
+            canvas.pack_forget()
+            frame.pack_forget()
+        self._io_pool.extend(self._io_panels)
+        self._io_panels = []
+        # Cap the pool so one large network does not pin its panels forever
+        for frame, _ in self._io_pool[IO_POOL_MAX:]:
+            frame.destroy()
+        del self._io_pool[IO_POOL_MAX:]
+
+    def _on_io_click(self, event, mod_nodes, action):
+        col, row = event.x // IO_CELL, event.y // IO_CELL
+        i = row * IO_COLS + col
+        if 0 <= col < IO_COLS and 0 <= i < len(mod_nodes):
+            self.input_action(mod_nodes[i], action)
+
+    def _cache_io_index(self):
+        index = self.net.node_index
+        self._io_idx = np.array([index[nid] for nid in self.io_widgets], dtype=np.int64)
+        self._io_is_output = np.array([entry[3] == 'output' for entry in self.io_widgets.values()], dtype=bool)
+        self._io_entries = [(self.net.nodes[nid],) + entry[:3] for nid, entry in self.io_widgets.items()]
+        self._prev_colors = np.full(len(self._io_idx), -1, dtype=np.int32) # -1: never drawn
 
     def input_action(self, node, action):
-        if action == "pulse":
-            node.activation = 1.0
-            node.potential = 1.0
-            node.isFiring = True
-            node.activationType = "PULSE"
-        elif action == "toggle":
-            if node.activation > 0.5:
-                node.activation = 0.0
-                node.potential = 0.0
-                node.isFiring = False
-            else:
+        def set_activation_type(activation_type):
+            # The engine captures activation types when it materializes
+            if node.activationType != activation_type:
+                node.activationType = activation_type
+                self.engine.invalidate()
+
+        def apply():
+            if action == "pulse":
                 node.activation = 1.0
                 node.potential = 1.0
                 node.isFiring = True
-                node.activationType = "SUSTAINED"
-        self._update_visuals()
+                set_activation_type("PULSE")
+            elif action == "toggle":
+                if node.activation > 0.5:
+                    node.activation = 0.0
+                    node.potential = 0.0
+                    node.isFiring = False
+                else:
+                    node.activation = 1.0
+                    node.potential = 1.0
+                    node.isFiring = True
+                    set_activation_type("SUSTAINED")
+        self._run_on_engine(apply)
+        self._refresh_visuals()
 
     def _update_visuals(self):
-        for node_id, (widget, w_type) in self.io_widgets.items():
-            if node_id not in self.net.nodes: continue
-            node = self.net.nodes[node_id]
-            if w_type == 'output':
-                val = int(min(node.activation, 1.0) * 255)
-                if node.isFiring: val = max(val, 100)
-                color = f"#00{val:02x}00"
-                if val < 20: color = "#111"
-                widget.configure(bg=color)
-            elif w_type == 'input':
-                if node.activation > 0.5:
-                    if node.activationType == 'SUSTAINED': widget.configure(bg="#ff5555", text="H")
-                    else: widget.configure(bg="#ff8800", text="P")
-                else: widget.configure(bg="#444", text="O")
+        if not len(self._io_idx): return
+        act = self.net.act[self._io_idx]
+
+        # State code per widget: the green level for outputs (0 = dark),
+        # 0 / 1 / 2 = idle / pulse / held for inputs. Output levels are
+        # quantized to 16 steps so small activation changes keep the cached
+        # state; the dark cutoff and the firing floor apply to the exact level
+        # and are kept as lower bounds after quantizing.
+        vals = (np.clip(act, 0.0, 1.0) * 255).astype(np.int32)
+        firing = self.net.firing[self._io_idx].astype(bool)
+        np.maximum(vals, 100, where=firing, out=vals)
+        vals[vals < 20] = 0
+        lit = vals > 0
+        vals &= ~0xF
+        np.maximum(vals, 20, where=lit, out=vals)
+        np.maximum(vals, 100, where=firing, out=vals)
+        codes = np.where(self._io_is_output, vals, act > 0.5)
+        for k in np.flatnonzero(codes == 1).tolist():
+            if not self._io_is_output[k] and self._io_entries[k][0].activationType == 'SUSTAINED':
+                codes[k] = 2
+
+        # Only reconfigure widgets whose state changed since the last redraw
+        for k in np.flatnonzero(codes != self._prev_colors).tolist():
+            _, canvas, rect, text = self._io_entries[k]
+            code = int(codes[k])
+            if self._io_is_output[k]:
+                canvas.itemconfig(rect, fill=f"#00{code:02x}00" if code else "#111")
+                continue
+            if code == 2: fill, label = "#ff5555", "H"
+            elif code == 1: fill, label = "#ff8800", "P"
+            else: fill, label = "#444", "O"
+            canvas.itemconfig(rect, fill=fill)
+            canvas.itemconfig(text, text=label)
+        self._prev_colors = codes
 
     # --- Module Inspector ---
     
@@ -317,15 +504,23 @@ class NeuralGUI:
         self.selected_module_id = mod_id
         
         # Populate Form
-        self.mod_vars["id"].set(mod.id)
-        self.mod_vars["type"].set(mod.type)
-        self.mod_vars["label"].set(mod.label or "")
+        self._set_entry("id", mod.id)
+        self._set_entry("type", mod.type)
+        self._set_entry("label", mod.label or "")
         
         # Handle optionals
-        self.mod_vars["decay"].set(mod.decay if hasattr(mod, 'decay') and mod.decay is not None else 0.1)
-        self.mod_vars["threshold"].set(mod.threshold if hasattr(mod, 'threshold') and mod.threshold is not None else 0.5)
-        self.mod_vars["hebbian"].set(bool(mod.hebbianLearning))
-        self.mod_vars["learningRate"].set(mod.learningRate if mod.learningRate is not None else 0.01)
+        self._set_entry("decay", f"{mod.decay if mod.decay is not None else 0.1:g}")
+        self._set_entry("threshold", f"{mod.threshold if mod.threshold is not None else 0.5:g}")
+        self.var_hebbian.set(bool(mod.hebbianLearning))
+        self._set_entry("learningRate", f"{mod.learningRate if mod.learningRate is not None else 0.01:g}")
+
+    def _set_entry(self, key, text):
+        entry = self._mod_entries[key]
+        readonly = entry.cget("state") == "readonly"
+        if readonly: entry.configure(state="normal")
+        entry.delete(0, tk.END)
+        entry.insert(0, text)
+        if readonly: entry.configure(state="readonly")
 
     def _apply_module_changes(self):
         if not self.selected_module_id: return
@@ -334,10 +529,10 @@ class NeuralGUI:
         
         # Read values
         try:
-            new_decay = self.mod_vars["decay"].get()
-            new_thresh = self.mod_vars["threshold"].get()
-            new_hebbian = self.mod_vars["hebbian"].get()
-            new_lr = self.mod_vars["learningRate"].get()
+            new_decay = float(self._mod_entries["decay"].get())
+            new_thresh = float(self._mod_entries["threshold"].get())
+            new_hebbian = self.var_hebbian.get()
+            new_lr = float(self._mod_entries["learningRate"].get())
             
             # Update Module Config
             mod.decay = new_decay
@@ -347,12 +542,14 @@ class NeuralGUI:
             
             # Update Nodes
             # Propagate changes to all nodes in this module
-            count = 0
-            for node in self.net.nodes.values():
-                if self.net.nodeModuleMap.get(node.id) == mod.id:
+            mod_nodes = [self.net.nodes[nid] for nid in self.net.moduleNodes.get(mod.id, [])]
+            def apply():
+                for node in mod_nodes:
                     node.decay = new_decay
                     node.threshold = new_thresh
-                    count += 1
+                self.engine.invalidate()
+            self._run_on_engine(apply)
+            count = len(mod_nodes)
             
             self.lbl_status.config(text=f"Updated {mod.id} and {count} nodes.", fg="blue")
             
@@ -0,0 +1,30 @@
+import json
+import mmap
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib codec
+    orjson = None
+
+def load_json(path: str) -> Any:
+    if orjson is not None:
+        # Parse straight from a read-only mapping instead of a bytes copy
+        with open(path, 'rb') as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty files cannot be mapped
+                return orjson.loads(f.read())
+            with mm:
+                return orjson.loads(memoryview(mm))
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def save_json(path: str, data: Any):
+    # Indented like the stdlib output so files stay diffable
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        return
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
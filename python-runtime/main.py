@@ -1,16 +1,22 @@
 import argparse
-import json
 import time
 import os
 from .model import NeuralNet
+from .jsonio import load_json, save_json
 from .engine import Engine
+from .engine_int8 import Int8Engine
 
 def main():
     parser = argparse.ArgumentParser(description='Headless Neural Network Runtime')
-    parser.add_argument('input_file', help='Path to input JSON network file')
-    parser.add_argument('output_file', help='Path to save output JSON network file')
+    parser.add_argument('input_file', help='Path to input network file (JSON or .npz)')
+    parser.add_argument('output_file', help='Path to save output network file (JSON or .npz)')
     parser.add_argument('--steps', type=int, default=100, help='Number of simulation steps to run')
     parser.add_argument('--benchmark', action='store_true', help='Print benchmark timing')
+    parser.add_argument('--debug', action='store_true', help='Print firing nodes every tick')
+    parser.add_argument('--format', choices=['json', 'npz'],
+                        help='Output file format (default: inferred from the output file suffix)')
+    parser.add_argument('--int8', action='store_true',
+                        help='Accumulate inputs from int8-quantized weights and activations')
 
     args = parser.parse_args()
 
@@ -22,24 +28,27 @@ def main():
     print(f"Loading network from {args.input_file}...")
     start_load = time.time()
     
-    with open(args.input_file, 'r') as f:
-        data = json.load(f)
-    
     net = NeuralNet()
-    net.from_json(data)
+    if args.input_file.endswith('.npz'):
+        net.load_npz(args.input_file)
+    else:
+        net.from_json(load_json(args.input_file))
     
     print(f"Network loaded. {len(net.nodes)} nodes, {len(net.connections)} connections, {len(net.modules)} modules.")
     print(f"Load time: {time.time() - start_load:.4f}s")
     
     # 2. Run
-    engine = Engine(net)
+    engine_cls = Int8Engine if args.int8 else Engine
+    engine = engine_cls(net, debug=args.debug)
     print(f"Running simulation for {args.steps} steps...")
     
     start_sim = time.time()
-    for i in range(args.steps):
-        engine.step()
-        if (i+1) % 100 == 0:
-            print(f"Step {i+1}/{args.steps}")
+    # Run in batches of 100 ticks (fused into one kernel call where possible)
+    for done in range(0, args.steps, 100):
+        batch = min(100, args.steps - done)
+        engine.step_batch(batch)
+        if batch == 100:
+            print(f"Step {done + batch}/{args.steps}")
             
     end_sim = time.time()
     duration = end_sim - start_sim
@@ -49,10 +58,12 @@ def main():
 
     # 3. Save
     print(f"Saving state to {args.output_file}...")
-    output_data = net.to_json()
-    
-    with open(args.output_file, 'w') as f:
-        json.dump(output_data, f, indent=2)
+    engine.flush()
+    output_format = args.format or ('npz' if args.output_file.endswith('.npz') else 'json')
+    if output_format == 'npz':
+        net.save_npz(args.output_file)
+    else:
+        save_json(args.output_file, net.to_json())
         
     print("Done.")
 
@@ -1,34 +1,102 @@
 import json
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any, Union
+import re
+from dataclasses import dataclass, fields
+from typing import List, Dict, Optional, Any
+
+import numpy as np
+
+class _StateField:
+    """
+    Node / Connection attribute backed by one of the NeuralNet arrays.
+    Until the record is added to a net the value is kept on the instance.
+    """
+    def __init__(self, array: str, default, cast=float):
+        self.array = array
+        self.default = default
+        self.cast = cast
+
+    def __set_name__(self, owner, name):
+        self.local = '_' + name
+
+    def __get__(self, node, owner=None):
+        if node is None:
+            return self.default
+        if node._net is None:
+            return getattr(node, self.local, self.default)
+        return self.cast(getattr(node._net, self.array)[node._idx])
+
+    def __set__(self, node, value):
+        if node._net is None:
+            setattr(node, self.local, value)
+        else:
+            getattr(node._net, self.array)[node._idx] = value
+
+class _ArrayBacked:
+    """
+    Base for records whose _StateFields live in NeuralNet arrays. While
+    attached, `_net` / `_idx` locate the record's row; detaching copies the
+    values back onto the instance.
+    """
+    # Owning net and row index (not dataclass fields)
+    _net = None
+    _idx = -1
+    _STATE_FIELDS = ()
+
+    def _attach(self, net: 'NeuralNet', idx: int):
+        values = [(name, getattr(self, name)) for name in self._STATE_FIELDS]
+        self._net, self._idx = net, idx
+        for name, value in values:
+            setattr(self, name, value)
+
+    def _detach(self):
+        values = [(name, getattr(self, name)) for name in self._STATE_FIELDS]
+        self._net, self._idx = None, -1
+        for name, value in values:
+            setattr(self, name, value)
+
+# Node and Connection are not slotted: their array-backed fields are
+# class-level descriptors, which dataclass(slots=True) would replace with
+# plain slots.
 
 @dataclass
-class Connection:
+class Connection(_ArrayBacked):
     id: str
     sourceId: str
     targetId: str
-    weight: float
-    signalStrength: float = 0.0
+    # Stored in NeuralNet.conn_weight / conn_signal once added to a net.
+    # An Engine learns on its own copy of these: they are only current after
+    # Engine.flush() (or invalidate()).
+    weight: float = _StateField('conn_weight', 0.0)
+    signalStrength: float = _StateField('conn_signal', 0.0)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "sourceId": self.sourceId,
+            "targetId": self.targetId,
+            "weight": self.weight,
+            "signalStrength": self.signalStrength
+        }
 
 @dataclass
-class Node:
+class Node(_ArrayBacked):
     id: str
     type: str # 'INPUT', 'OUTPUT', 'HIDDEN', etc.
     x: float
     y: float
     
-    # State
-    potential: float = 0.0
-    activation: float = 0.0
-    isFiring: bool = False
-    refractoryTimer: int = 0
+    # State (stored in the NeuralNet state arrays once added to a net)
+    potential: float = _StateField('pot', 0.0)
+    activation: float = _StateField('act', 0.0)
+    isFiring: bool = _StateField('firing', False, bool)
+    refractoryTimer: int = _StateField('refr', 0, int)
     
     # Configuration (Defaults based on typical Node.ts values)
     label: str = ""
-    bias: float = 0.0
-    decay: float = 0.1
-    threshold: float = 0.5
-    refractoryPeriod: int = 0
+    bias: float = _StateField('bias', 0.0)
+    decay: float = _StateField('decay', 0.1)
+    threshold: float = _StateField('threshold', 0.5)
+    refractoryPeriod: int = _StateField('refr_period', 0, int)
     activationType: str = "PULSE" # "PULSE" or "SUSTAINED"
     
     # Input Specific
@@ -62,7 +130,35 @@ class Node:
             "inputFrequency": self.inputFrequency
         }
 
-@dataclass
+for _cls in (Node, Connection):
+    _cls._STATE_FIELDS = tuple(name for name, value in vars(_cls).items() if isinstance(value, _StateField))
+
+# NeuralNet state arrays backing the Node._StateFields. Dynamic state is
+# float32; configuration stays float64 so it round-trips through JSON unchanged.
+_NODE_ARRAYS = {
+    'pot': np.float32,
+    'act': np.float32,
+    'firing': np.uint8,
+    'refr': np.int32,
+    'bias': np.float64,
+    'decay': np.float64,
+    'threshold': np.float64,
+    'refr_period': np.int32,
+}
+
+# NeuralNet connection arrays, indexed by position in NeuralNet.connections.
+# Endpoints are node indices (-1 while the id is not a node of the net).
+_CONN_ARRAYS = {
+    'conn_src': np.int32,
+    'conn_tgt': np.int32,
+    'conn_weight': np.float64,
+    'conn_signal': np.float64,
+}
+
+# Node fields not backed by arrays; stored as JSON metadata in .npz checkpoints
+_NODE_META_FIELDS = ('id', 'type', 'x', 'y', 'label', 'activationType', 'inputType', 'inputFrequency')
+
+@dataclass(slots=True)
 class ModuleConfig:
     id: str
     type: str
@@ -81,6 +177,7 @@ class ModuleConfig:
     
     activationType: Optional[str] = None
     threshold: Optional[float] = None
+    decay: Optional[float] = None
     refractoryPeriod: Optional[int] = None
     
     hebbianLearning: Optional[bool] = None
@@ -102,54 +199,343 @@ class ModuleConfig:
         # Filter out keys that might not exist in the class fields to avoid errors
         # (Though dataclasses usually ignore extras if not strict, but explicit is better)
         # Actually standard dataclass init doesn't support extra keys, so we filter.
-        valid_keys = cls.__annotations__.keys()
-        filtered = {k: v for k, v in data.items() if k in valid_keys}
-        return cls(**filtered)
+        return cls(**{k: v for k, v in data.items() if k in cls._VALID})
+
+    def to_dict(self):
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        # decay used to be an ad-hoc attribute set by the GUI inspector, so it
+        # is only exported once set, keeping other modules' records unchanged
+        if self.decay is None:
+            del data["decay"]
+        return data
+
+# Field names accepted from JSON records, computed once per class
+for _cls in (Node, Connection, ModuleConfig):
+    _cls._VALID = frozenset(f.name for f in fields(_cls))
+del _cls
+
+def _quantize_int8(values: np.ndarray, groups: np.ndarray, n_groups: int):
+    # One symmetric scale per group, mapping the group's largest |value| to 127
+    # (few groups: one pass per group is faster than np.maximum.at)
+    abs_values = np.abs(values)
+    max_abs = np.array([abs_values[groups == g].max(initial=0.0) for g in range(n_groups)],
+                       dtype=np.float64)
+    group_scale = np.where(max_abs > 0, max_abs / 127, 1.0)
+    scale = group_scale[groups]
+    q = np.clip(np.rint(values / scale), -127, 127).astype(np.int8)
+    return q, scale.astype(np.float32)
+
+# Trailing node index of an id such as "input-1-0-7"
+_SUFFIX_RE = re.compile(r'-(\d+)$')
+
+def _node_sort_key(node_id: str):
+    # Indexed ids first, by index; any others after them by id
+    m = _SUFFIX_RE.search(node_id)
+    return (0, int(m.group(1))) if m else (1, node_id)
 
 class NeuralNet:
     def __init__(self):
         self.nodes: Dict[str, Node] = {}
+        # Node state and configuration as Structure-of-Arrays (see _NODE_ARRAYS),
+        # indexed by node_index. The Node fields read and write these arrays.
+        self.node_index: Dict[str, int] = {}
+        self._alloc_arrays(0)
+        # Connections: objects in insertion order, fields in _CONN_ARRAYS
         self.connections: List[Connection] = []
+        self._alloc_conn_arrays(0)
+        # Bumped whenever existing connections change position (removal,
+        # reload), so a cached position is known to be stale
+        self.conn_version: int = 0
         self.modules: Dict[str, ModuleConfig] = {}
+        self.modules_by_type: Dict[str, List[ModuleConfig]] = {} # modules per type, in module order
         self.moduleConnections: Dict[str, Any] = {} # Storing generic dict for now
         self.incoming: Dict[str, List[Connection]] = {}
         self.nodeModuleMap: Dict[str, str] = {}
+        self.moduleNodes: Dict[str, List[str]] = {} # Inverse of nodeModuleMap, in node order
+        self.sortedModuleNodes: Dict[str, List[str]] = {} # moduleNodes in node index order
         self.tickCount: int = 0
+        # Per array name: the over-allocated buffer the array is a prefix view
+        # of while it grows one row at a time (see _append_rows)
+        self._row_buffers: Dict[str, np.ndarray] = {}
+
+    def _alloc_arrays(self, n: int):
+        for name, dtype in _NODE_ARRAYS.items():
+            setattr(self, name, np.zeros(n, dtype=dtype))
+
+    def _alloc_conn_arrays(self, n: int):
+        for name, dtype in _CONN_ARRAYS.items():
+            setattr(self, name, np.zeros(n, dtype=dtype))
+
+    def _append_rows(self, spec: Dict[str, Any]):
+        # Grow each array of `spec` by one zeroed row. Rows are appended into
+        # spare capacity (doubled when full), so adding records one at a time
+        # is amortized O(1) per record; arrays replaced wholesale elsewhere
+        # are copied into a fresh buffer on their next append.
+        for name, dtype in spec.items():
+            arr = getattr(self, name)
+            n = len(arr)
+            buf = self._row_buffers.get(name)
+            if buf is None or arr.base is not buf or n >= len(buf):
+                buf = np.zeros(max(8, 2 * n), dtype=dtype)
+                buf[:n] = arr
+                self._row_buffers[name] = buf
+            buf[n] = 0
+            setattr(self, name, buf[:n + 1])
 
     def add_node(self, node: Node):
+        # Grows the state arrays by one row (amortized O(1)); loads attach all
+        # nodes at once with _attach_nodes. An Engine on this net must be invalidated.
+        old = self.nodes.get(node.id)
+        if old is not None:
+            idx = old._idx
+            old._detach()
+        else:
+            idx = len(self.nodes)
+            self._append_rows(_NODE_ARRAYS)
+            self.node_index[node.id] = idx
         self.nodes[node.id] = node
+        node._attach(self, idx)
+        if old is None and len(self.connections):
+            # Connections may already reference the new id
+            for pos in np.flatnonzero((self.conn_src < 0) | (self.conn_tgt < 0)).tolist():
+                self._index_endpoints(pos)
+
+    def _attach_nodes(self):
+        # Allocate the arrays for the current node count, then fill them by index
+        self._alloc_arrays(len(self.nodes))
+        self.node_index = {}
+        for idx, node in enumerate(self.nodes.values()):
+            self.node_index[node.id] = idx
+            node._attach(self, idx)
+
+    def reset_state(self):
+        self.pot.fill(0)
+        self.act.fill(0)
+        self.firing.fill(0)
+        self.refr.fill(0)
 
     def add_connection(self, conn: Connection):
+        # Grows the connection arrays by one row (amortized O(1)); bulk loads
+        # use _attach_connections.
+        pos = len(self.connections)
+        self._append_rows(_CONN_ARRAYS)
         self.connections.append(conn)
-        if conn.targetId not in self.incoming:
-            self.incoming[conn.targetId] = []
-        self.incoming[conn.targetId].append(conn)
+        conn._attach(self, pos)
+        self._index_endpoints(pos)
+        self.incoming.setdefault(conn.targetId, []).append(conn)
+
+    def _attach_connections(self, conns: List[Connection]):
+        # Replace all connections, allocating the arrays once
+        self.conn_version += 1
+        self.connections = list(conns)
+        self._alloc_conn_arrays(len(self.connections))
+        self.incoming.clear()
+        index = self.node_index
+        for pos, conn in enumerate(self.connections):
+            conn._attach(self, pos)
+            self.incoming.setdefault(conn.targetId, []).append(conn)
+        self.conn_src[:] = [index.get(c.sourceId, -1) for c in self.connections]
+        self.conn_tgt[:] = [index.get(c.targetId, -1) for c in self.connections]
+
+    def _index_endpoints(self, pos: int):
+        conn = self.connections[pos]
+        self.conn_src[pos] = self.node_index.get(conn.sourceId, -1)
+        self.conn_tgt[pos] = self.node_index.get(conn.targetId, -1)
+
+    def remove_connections(self, positions: np.ndarray):
+        """Remove the connections at the given positions of self.connections."""
+        self.conn_version += 1
+        keep = np.ones(len(self.connections), dtype=bool)
+        keep[positions] = False
+        for pos in np.flatnonzero(~keep).tolist():
+            conn = self.connections[pos]
+            self.incoming[conn.targetId].remove(conn)
+            conn._detach()
+        self.connections = [c for c, k in zip(self.connections, keep.tolist()) if k]
+        for name in _CONN_ARRAYS:
+            setattr(self, name, getattr(self, name)[keep])
+        for pos, conn in enumerate(self.connections):
+            conn._idx = pos
 
     def add_module(self, module: ModuleConfig):
+        old = self.modules.get(module.id)
+        if old is not None:
+            self.modules_by_type[old.type].remove(old)
         self.modules[module.id] = module
+        self.modules_by_type.setdefault(module.type, []).append(module)
 
     def to_json(self):
+        # Weights and signals as of the last Engine.flush(); flush first
         return {
-            "modules": [m.__dict__ for m in self.modules.values()],
-            "nodes": [n.to_dict() for n in self.nodes.values()],
-            "connections": [c.__dict__ for c in self.connections],
+            "modules": [m.to_dict() for m in self.modules.values()],
+            "nodes": self._nodes_to_json(),
+            "connections": self._connections_to_json(),
             "moduleConnections": list(self.moduleConnections.items()),
             "tickCount": self.tickCount
         }
 
-    def from_json(self, data: Dict[str, Any]):
+    def _connections_to_json(self) -> List[Dict[str, Any]]:
+        # Same layout as Connection.to_dict, with weights / signals read in bulk
+        return [{
+            "id": c.id,
+            "sourceId": c.sourceId,
+            "targetId": c.targetId,
+            "weight": w,
+            "signalStrength": s
+        } for c, w, s in zip(self.connections, self.conn_weight.tolist(), self.conn_signal.tolist())]
+
+    def _nodes_to_json(self) -> List[Dict[str, Any]]:
+        # Same layout as Node.to_dict, with the array-backed fields read in
+        # bulk and zipped with the nodes (which are in array order)
+        return [{
+            "id": n.id,
+            "type": n.type,
+            "x": n.x,
+            "y": n.y,
+            "label": n.label,
+            "activationType": n.activationType,
+            "potential": pot,
+            "activation": act,
+            "isFiring": firing,
+            "refractoryTimer": refr,
+            "bias": bias,
+            "decay": decay,
+            "threshold": threshold,
+            "refractoryPeriod": refr_period,
+            "inputType": n.inputType,
+            "inputFrequency": n.inputFrequency
+        } for n, pot, act, firing, refr, bias, decay, threshold, refr_period in zip(
+            self.nodes.values(), self.pot.tolist(), self.act.tolist(),
+            self.firing.astype(bool).tolist(), self.refr.tolist(), self.bias.tolist(),
+            self.decay.tolist(), self.threshold.tolist(), self.refr_period.tolist())]
+
+    def save_npz(self, path: str):
+        """
+        Save a compressed .npz checkpoint. Node state/configuration and
+        connection weights are stored as binary arrays; ids, the remaining
+        node fields and module configs go into a JSON `meta` entry.
+        Connection weights and signals are saved as of the last
+        Engine.flush(), so flush the engine running on this net first.
+        """
+        nodes = list(self.nodes.values()) # Same order as the state arrays
+        # Connection endpoints index into the node ids, followed by any
+        # ids that connections reference but that are not nodes of this net.
+        endpoint_ids = [n.id for n in nodes]
+        endpoint_index = dict(self.node_index)
+        def endpoint(node_id):
+            idx = endpoint_index.get(node_id)
+            if idx is None:
+                idx = endpoint_index[node_id] = len(endpoint_ids)
+                endpoint_ids.append(node_id)
+            return idx
+        conn_src = np.array([endpoint(c.sourceId) for c in self.connections], dtype=np.int32)
+        conn_tgt = np.array([endpoint(c.targetId) for c in self.connections], dtype=np.int32)
+
+        meta = {
+            "modules": [m.to_dict() for m in self.modules.values()],
+            "nodes": {name: [getattr(n, name) for n in nodes] for name in _NODE_META_FIELDS},
+            "extraEndpointIds": endpoint_ids[len(nodes):],
+            "connectionIds": [c.id for c in self.connections],
+            "moduleConnections": list(self.moduleConnections.items()),
+            "tickCount": self.tickCount
+        }
+        np.savez_compressed(
+            path,
+            meta=np.array(json.dumps(meta)),
+            conn_src=conn_src,
+            conn_tgt=conn_tgt,
+            conn_weight=self.conn_weight,
+            conn_signal=self.conn_signal,
+            **{name: getattr(self, name) for name in _NODE_ARRAYS},
+        )
+
+    def load_npz(self, path: str):
+        with np.load(path) as data:
+            meta = json.loads(data["meta"].item())
+            self._clear()
+            self.tickCount = meta["tickCount"]
+
+            for m_data in meta["modules"]:
+                self.add_module(ModuleConfig.from_dict(m_data))
+
+            node_fields = meta["nodes"]
+            for values in zip(*(node_fields[name] for name in _NODE_META_FIELDS)):
+                node = Node(**dict(zip(_NODE_META_FIELDS, values)))
+                self.nodes[node.id] = node
+            self._attach_nodes()
+            for name in _NODE_ARRAYS:
+                getattr(self, name)[:] = data[name]
+            self._rebuild_node_module_map()
+
+            endpoint_ids = node_fields["id"] + meta["extraEndpointIds"]
+            self._attach_connections([
+                Connection(id=conn_id, sourceId=endpoint_ids[s], targetId=endpoint_ids[t])
+                for conn_id, s, t in zip(meta["connectionIds"], data["conn_src"].tolist(), data["conn_tgt"].tolist())
+            ])
+            self.conn_weight[:] = data["conn_weight"]
+            self.conn_signal[:] = data["conn_signal"]
+
+            self._load_module_connections(meta["moduleConnections"])
+
+    def quantize(self) -> Dict[str, np.ndarray]:
+        """
+        Symmetric int8 quantization of the node potentials, activations and
+        connection weights. Potentials and weights get one scale per module
+        (a connection uses its target's module; nodes outside any module
+        share one extra scale). Activations always lie in [0, 1] and use the
+        fixed scale 1/127. Returns the int8 arrays `pot_q`, `act_q`,
+        `conn_w_q` with float32 per-element scales `pot_scale`, `act_scale`,
+        `conn_w_scale`, so that e.g. conn_weight ~= conn_w_q * conn_w_scale.
+        """
+        node_group, conn_group, n_groups = self._quantization_groups()
+        pot_q, pot_scale = _quantize_int8(self.pot, node_group, n_groups)
+        conn_w_q, conn_w_scale = _quantize_int8(self.conn_weight, conn_group, n_groups)
+        act_q = np.rint(np.clip(self.act, 0.0, 1.0) * 127).astype(np.int8)
+        return {
+            "pot_q": pot_q,
+            "act_q": act_q,
+            "conn_w_q": conn_w_q,
+            "pot_scale": pot_scale,
+            "act_scale": np.full(len(self.act), 1.0 / 127, dtype=np.float32),
+            "conn_w_scale": conn_w_scale,
+        }
+
+    def _quantization_groups(self):
+        # Module index of every node and of every connection's target; nodes
+        # outside any module (and missing targets) get the extra last group
+        mod_order = {mod_id: k for k, mod_id in enumerate(self.modules)}
+        n_groups = len(mod_order) + 1
+        node_group = np.array([mod_order.get(self.nodeModuleMap.get(node_id), n_groups - 1)
+                               for node_id in self.nodes], dtype=np.int64)
+        conn_group = np.full(len(self.connections), n_groups - 1, dtype=np.int64)
+        has_tgt = self.conn_tgt >= 0
+        conn_group[has_tgt] = node_group[self.conn_tgt[has_tgt]]
+        return node_group, conn_group, n_groups
+
+    def _clear(self):
+        for node in self.nodes.values():
+            node._detach()
+        for conn in self.connections:
+            conn._detach()
         self.nodes.clear()
         self.connections = []
+        self._alloc_conn_arrays(0)
+        self.conn_version += 1
         self.modules.clear()
+        self.modules_by_type.clear()
         self.moduleConnections.clear()
         self.incoming.clear()
         self.nodeModuleMap.clear()
+        self.moduleNodes.clear()
+        self.sortedModuleNodes.clear()
+
+    def from_json(self, data: Dict[str, Any]):
+        self._clear()
         self.tickCount = data.get("tickCount", 0)
 
         # Load Modules
         for m_data in data.get("modules", []):
-            module = ModuleConfig.from_dict(m_data)
-            self.modules[module.id] = module
+            self.add_module(ModuleConfig.from_dict(m_data))
 
         # Load Nodes
         for n_data in data.get("nodes", []):
@@ -164,9 +550,7 @@ class NeuralNet:
             # For now, we load what's there.
             
             # Simple kwargs based init, filtering extras
-            valid_keys = Node.__annotations__.keys()
-            filtered = {k: v for k, v in n_data.items() if k in valid_keys}
-            node = Node(**filtered)
+            node = Node(**{k: v for k, v in n_data.items() if k in Node._VALID})
             
             # CRITICAL FIX: Enforce IO behavior to match TypeScript
             if node.type in ('OUTPUT', 'INTERPRETATION'):
@@ -174,34 +558,44 @@ class NeuralNet:
                 
             self.nodes[node.id] = node
 
+        self._attach_nodes()
+        self._rebuild_node_module_map()
+
+        # Load Connections
+        self._attach_connections([Connection(
+            id=c_data["id"],
+            sourceId=c_data["sourceId"],
+            targetId=c_data["targetId"],
+            weight=c_data["weight"],
+            signalStrength=c_data.get("signalStrength", 0.0)
+        ) for c_data in data.get("connections", [])])
+            
+        self._load_module_connections(data.get("moduleConnections", []))
+
+    def _rebuild_node_module_map(self):
         # Rebuild Node->Module Map
         # TS iterates modules and calls getModuleNodes. Here we don't have that yet.
         # We can infer from ID prefix convention (moduleId + "-n" + index) used in TS.
-        for mod in self.modules.values():
-            prefix = mod.id + "-"
-            for node in self.nodes.values():
-                if node.id.startswith(prefix):
-                    self.nodeModuleMap[node.id] = mod.id
-                    # Also apply module-level defaults if node values are default/missing?
-                    # The Node constructor already ran.
-                    # For a robust import of "Partial" JSON from visualizer:
-                    if mod.activationType and node.activationType == "PULSE": # "PULSE" is default
-                         # Check if we should override. 
-                         # Actually, let's trust the JSON for now. 
-                         pass
+        # Module ids may contain "-" themselves, so every "-" in a node id is a
+        # candidate boundary; if several modules match, the last one in module
+        # order wins.
+        mod_ids = list(self.modules)
+        mod_order = {mod_id: k for k, mod_id in enumerate(mod_ids)}
+        for node_id in self.nodes:
+            best = -1
+            cut = node_id.find('-')
+            while cut != -1:
+                best = max(best, mod_order.get(node_id[:cut], -1))
+                cut = node_id.find('-', cut + 1)
+            if best >= 0:
+                self.nodeModuleMap[node_id] = mod_ids[best]
+                self.moduleNodes.setdefault(mod_ids[best], []).append(node_id)
+        # Sorted once per load for the GUI's I/O grids
+        for mod_id, ids in self.moduleNodes.items():
+            self.sortedModuleNodes[mod_id] = sorted(ids, key=_node_sort_key)
 
-        # Load Connections
-        for c_data in data.get("connections", []):
-            self.add_connection(Connection(
-                id=c_data["id"],
-                sourceId=c_data["sourceId"],
-                targetId=c_data["targetId"],
-                weight=c_data["weight"],
-                signalStrength=c_data.get("signalStrength", 0.0)
-            ))
-            
+    def _load_module_connections(self, m_conns):
         # Load Module Connections
-        m_conns = data.get("moduleConnections", [])
         # TS exports Array.from(entries) -> [[key, val], [key, val]]
         if isinstance(m_conns, list):
             for item in m_conns:
@@ -0,0 +1,273 @@
+"""
+Baseline equivalence check for the array engine.
+
+`ReferenceEngine` is a copy of the original per-node tick loop (dicts of
+plain records, one Python pass per node and connection). A seeded random
+net covering every phase (SIN inputs, manual PULSE inputs and concepts,
+PULSE and SUSTAINED nodes, external BRAIN normalization, Hebbian learning
+with pruning) is run through both for a number of ticks, via step() and via
+step_batch(), and the node state, weights and surviving connections are
+compared. Spike jitter uses a fixed uniform so both sides draw the same.
+
+Run from the repository root:
+    python -m unittest discover -s python-runtime/tests
+"""
+import copy
+import importlib
+import math
+import os
+import random
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+model = importlib.import_module("python-runtime.model")
+engine = importlib.import_module("python-runtime.engine")
+
+TICKS = 60
+TOL = 1e-4 # The engine keeps its state in float32
+
+
+def make_net_data(seed: int) -> dict:
+    rng = random.Random(seed)
+    modules = [
+        {"id": "in", "type": "INPUT", "x": 0, "y": 0, "nodeCount": 4},
+        {"id": "con", "type": "CONCEPT", "x": 0, "y": 0, "nodeCount": 3},
+        {"id": "b1", "type": "BRAIN", "x": 0, "y": 0, "nodeCount": 24,
+         "hebbianLearning": True, "learningRate": 0.02, "pruningThreshold": 0.05},
+        {"id": "b2", "type": "BRAIN", "x": 0, "y": 0, "nodeCount": 16},
+        {"id": "out", "type": "OUTPUT", "x": 0, "y": 0, "nodeCount": 4},
+    ]
+    nodes = []
+    for k in range(4):
+        nodes.append({"id": f"in-n{k}", "type": "INPUT", "x": 0, "y": 0,
+                      "inputType": "SIN" if k < 3 else "PULSE", "inputFrequency": 0.5 + k,
+                      "activationType": "PULSE", "activation": 1.0 if k == 3 else 0.0})
+    for k in range(3):
+        nodes.append({"id": f"con-n{k}", "type": "CONCEPT", "x": 0, "y": 0, "inputType": "PULSE",
+                      "activationType": "SUSTAINED" if k == 2 else "PULSE", "activation": 1.0,
+                      "potential": 1.0, "isFiring": True})
+    for mod, count in (("b1", 24), ("b2", 16), ("out", 4)):
+        for k in range(count):
+            nodes.append({"id": f"{mod}-n{k}", "type": "OUTPUT" if mod == "out" else "HIDDEN",
+                          "x": 0, "y": 0,
+                          "activationType": "SUSTAINED" if rng.random() < 0.25 else "PULSE",
+                          "threshold": rng.uniform(0.3, 1.2), "decay": rng.uniform(0.05, 0.3),
+                          "bias": rng.uniform(0.0, 0.08), "refractoryPeriod": rng.randint(0, 3),
+                          "potential": rng.uniform(0.0, 1.0)})
+    for n in nodes:
+        if n["type"] == "OUTPUT":
+            n["decay"] = 1.0 # As NeuralNet.from_json enforces for OUTPUT nodes
+
+    ids = [n["id"] for n in nodes]
+    by_mod = {m["id"]: [i for i in ids if i.startswith(m["id"] + "-")] for m in modules}
+    connections = []
+
+    def connect(src_mod, tgt_mod, count, lo, hi):
+        for _ in range(count):
+            connections.append({"id": f"c{len(connections)}",
+                                "sourceId": rng.choice(by_mod[src_mod]),
+                                "targetId": rng.choice(by_mod[tgt_mod]),
+                                "weight": rng.uniform(lo, hi)})
+
+    connect("in", "b1", 40, 0.1, 0.6)
+    connect("con", "b1", 20, 0.1, 0.6)
+    connect("b1", "b1", 150, -0.3, 0.8) # Internal (learning, some pruned)
+    connect("b1", "b2", 60, 0.0, 0.9)   # External BRAIN inputs (normalized)
+    connect("b2", "b2", 50, -0.2, 0.7)
+    connect("b2", "b1", 30, 0.0, 0.9)
+    connect("b2", "out", 30, 0.0, 1.0)
+    connect("b1", "con", 10, 0.1, 0.5)  # Charges the SUSTAINED concept node
+    # Dangling endpoint: ignored by both engines
+    connections.append({"id": "dangling", "sourceId": "gone", "targetId": "b1-n0", "weight": 1.0})
+    return {"modules": modules, "nodes": nodes, "connections": connections, "tickCount": 0}
+
+
+class ReferenceEngine:
+    """The original per-node Engine.step, on plain dict records."""
+
+    def __init__(self, data: dict, uniform: float):
+        defaults = model.Node(id="", type="", x=0, y=0)
+        fields_ = ("type", "inputType", "inputFrequency", "activationType", "activation", "potential",
+                   "isFiring", "refractoryTimer", "refractoryPeriod", "threshold", "decay", "bias")
+        self.nodes = {}
+        for n in data["nodes"]:
+            rec = {f: n.get(f, getattr(defaults, f)) for f in fields_}
+            rec["id"] = n["id"]
+            self.nodes[n["id"]] = rec
+        self.modules = {m["id"]: m for m in data["modules"]}
+        self.node_module = {nid: nid.rsplit("-", 1)[0] for nid in self.nodes
+                            if nid.rsplit("-", 1)[0] in self.modules}
+        self.connections = [dict(c) for c in data["connections"]]
+        self.tick = data["tickCount"]
+        self.uniform = uniform
+
+    def step(self):
+        self.tick += 1
+        nodes = self.nodes
+        for node in nodes.values():
+            if node["type"] == "INPUT":
+                if node["inputType"] == "SIN":
+                    freq = (node["inputFrequency"] or 1.0) * 0.1
+                    node["activation"] = (math.sin(self.tick * freq) + 1) / 2
+                    node["potential"] = node["activation"]
+                node["isFiring"] = node["activation"] > 0.5
+
+        incoming = {}
+        for conn in self.connections:
+            incoming.setdefault(conn["targetId"], []).append(conn)
+        input_sums = {}
+        for node in nodes.values():
+            if node["type"] == "INPUT":
+                continue
+            total = 0.0
+            brain_inputs = {}
+            tgt_mod = self.node_module.get(node["id"])
+            for conn in incoming.get(node["id"], []):
+                src = nodes.get(conn["sourceId"])
+                if src is None:
+                    continue
+                raw = src["activation"] * conn["weight"]
+                src_mod = self.node_module.get(src["id"])
+                if src_mod and src_mod != tgt_mod and self.modules[src_mod]["type"] == "BRAIN":
+                    brain_inputs.setdefault(src_mod, []).append(raw)
+                else:
+                    total += raw
+            for raws in brain_inputs.values():
+                total += sum(raw / len(raws) for raw in raws)
+            input_sums[node["id"]] = total
+
+        for node in nodes.values():
+            if node["type"] != "INPUT":
+                self._update_node(node, input_sums[node["id"]])
+
+        for mod in self.modules.values():
+            if mod["type"] == "BRAIN" and mod.get("hebbianLearning"):
+                self._process_hebbian(mod)
+
+        for node in nodes.values():
+            if (node["type"] in ("INPUT", "CONCEPT") and node["inputType"] == "PULSE"
+                    and node["activationType"] == "PULSE"):
+                node["activation"] = 0.0
+                node["potential"] = 0.0
+                node["isFiring"] = False
+
+    def _update_node(self, node: dict, input_sum: float):
+        if node["refractoryTimer"] > 0:
+            node["refractoryTimer"] -= 1
+            node["isFiring"] = False
+            node["activation"] = 0.0
+            if node["activationType"] == "PULSE":
+                node["potential"] = 0.0
+            return
+        node["potential"] += input_sum + node["bias"]
+        if node["potential"] >= node["threshold"]:
+            node["isFiring"] = True
+            node["activation"] = 1.0
+            node["refractoryTimer"] = node["refractoryPeriod"] + (1 if self.uniform < 0.5 else 0)
+            if node["activationType"] == "PULSE":
+                node["potential"] -= node["threshold"]
+        else:
+            node["isFiring"] = False
+            node["activation"] = 0.0
+        node["potential"] *= 1.0 - node["decay"]
+        node["potential"] = min(max(node["potential"], 0.0), node["threshold"] * 4.0)
+
+    def _process_hebbian(self, module: dict):
+        rate = module.get("learningRate") or 0.01
+        thresh = module.get("pruningThreshold")
+        thresh = 0.05 if thresh is None else thresh
+        prefix = module["id"]
+        remove = []
+        for conn in self.connections:
+            if not (conn["sourceId"].startswith(prefix) and conn["targetId"].startswith(prefix)):
+                continue
+            src, tgt = self.nodes.get(conn["sourceId"]), self.nodes.get(conn["targetId"])
+            if src and tgt:
+                conn["weight"] = min(conn["weight"] + src["activation"] * tgt["activation"] * rate, 2.0)
+                if abs(conn["weight"]) < thresh:
+                    remove.append(conn["id"])
+        if remove:
+            removed = set(remove)
+            self.connections = [c for c in self.connections if c["id"] not in removed]
+
+
+class EngineBaselineTest(unittest.TestCase):
+    def _run_engine(self, data: dict, uniform: float, run):
+        net = model.NeuralNet()
+        net.from_json(copy.deepcopy(data))
+        eng = engine.Engine(net)
+        eng._draw_uniform = lambda n: np.full(n, uniform, dtype=np.float32)
+        run(eng)
+        eng.flush()
+        return net
+
+    def _compare(self, net, ref: ReferenceEngine):
+        self.assertEqual(net.tickCount, ref.tick)
+        ids = list(ref.nodes)
+        idx = [net.node_index[i] for i in ids]
+        for name, field_ in (("act", "activation"), ("pot", "potential")):
+            expected = np.array([ref.nodes[i][field_] for i in ids])
+            np.testing.assert_allclose(getattr(net, name)[idx], expected, atol=TOL, err_msg=name)
+        np.testing.assert_array_equal(net.firing[idx].astype(bool),
+                                      [ref.nodes[i]["isFiring"] for i in ids])
+        np.testing.assert_array_equal(net.refr[idx], [ref.nodes[i]["refractoryTimer"] for i in ids])
+
+        self.assertEqual([c.id for c in net.connections], [c["id"] for c in ref.connections])
+        np.testing.assert_allclose(net.conn_weight, [c["weight"] for c in ref.connections], atol=TOL)
+
+    def _check(self, run):
+        for seed in (1, 2, 3):
+            for uniform in (0.25, 0.75): # With and without refractory jitter
+                with self.subTest(seed=seed, uniform=uniform):
+                    data = make_net_data(seed)
+                    ref = ReferenceEngine(copy.deepcopy(data), uniform)
+                    for _ in range(TICKS):
+                        ref.step()
+                    self.assertLess(len(ref.connections), len(data["connections"])) # Pruning ran
+                    self._compare(self._run_engine(data, uniform, run), ref)
+
+    def test_step(self):
+        def run(eng):
+            for _ in range(TICKS):
+                eng.step()
+        self._check(run)
+
+    def test_step_batch(self):
+        self._check(lambda eng: eng.step_batch(TICKS))
+
+    def test_step_batch_chunks(self):
+        def run(eng):
+            for count in (1, 7, 13, TICKS - 21):
+                eng.step_batch(count)
+        self._check(run)
+
+    def test_activation_type_change(self):
+        # Nodes switched to SUSTAINED mid-run (the GUI hold toggle) stop
+        # being soft-reset once the engine is invalidated
+        half = TICKS // 2
+        for seed in (1, 2, 3):
+            with self.subTest(seed=seed):
+                data = make_net_data(seed)
+                held = ["con-n0"] + [n["id"] for n in data["nodes"]
+                                     if n["id"].startswith("b1-") and n["activationType"] == "PULSE"]
+                ref = ReferenceEngine(copy.deepcopy(data), 0.25)
+                for tick in range(TICKS):
+                    if tick == half:
+                        for nid in held:
+                            ref.nodes[nid]["activationType"] = "SUSTAINED"
+                    ref.step()
+
+                def run(eng):
+                    eng.step_batch(half)
+                    for nid in held:
+                        eng.net.nodes[nid].activationType = "SUSTAINED"
+                    eng.invalidate()
+                    eng.step_batch(TICKS - half)
+                self._compare(self._run_engine(data, 0.25, run), ref)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Engine.flush / invalidate write-back of the float32 connection state.
+
+Run from the repository root:
+    python -m unittest discover -s python-runtime/tests
+"""
+import copy
+import importlib
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+model = importlib.import_module("python-runtime.model")
+engine = importlib.import_module("python-runtime.engine")
+
+from test_engine_baseline import make_net_data
+
+
+class EngineFlushTest(unittest.TestCase):
+    def setUp(self):
+        self.data = make_net_data(1)
+        self.net = model.NeuralNet()
+        self.net.from_json(copy.deepcopy(self.data))
+        self.engine = engine.Engine(self.net)
+        np.random.seed(0) # Spike jitter
+        for _ in range(10):
+            self.engine.step() # Learns and prunes
+
+    def test_flush_writes_learned_weights(self):
+        loaded = {c["id"]: c["weight"] for c in self.data["connections"]}
+        self.engine.flush()
+        self.assertTrue(any(c.weight != loaded[c.id] for c in self.net.connections))
+        arr = self.engine._arrays
+        np.testing.assert_allclose(self.net.conn_weight[arr.conn_pos], arr.weight, rtol=1e-6)
+
+    def test_external_weight_edit_survives_invalidate(self):
+        # Connection 0 (input -> brain) does not learn, so only the edit changes it
+        conn = self.net.connections[0]
+        conn.weight = 1.5
+        self.engine.invalidate()
+        self.assertEqual(conn.weight, 1.5)
+        self.engine.step() # Re-materializes with the edited weight
+        arr = self.engine._arrays
+        self.assertEqual(float(arr.weight[list(arr.conn_pos).index(0)]), 1.5)
+
+    def test_invalidate_after_external_removal(self):
+        # Learned weights are written to the connections that are left, at
+        # their new positions
+        arr = self.engine._arrays
+        expected = {c.id: float(w) for c, w in zip(arr.conns, arr.weight)}
+        removed = {c.id for c in self.net.connections[:3]}
+        self.net.remove_connections(np.arange(3))
+        self.engine.invalidate()
+        for conn in self.net.connections:
+            self.assertNotIn(conn.id, removed)
+            if conn.id in expected:
+                self.assertAlmostEqual(conn.weight, expected[conn.id], places=6)
+        self.engine.step() # Re-materializes on the new topology
+        self.assertEqual(len(self.engine._arrays.conns),
+                         sum(c.sourceId in self.net.nodes for c in self.net.connections))
+
+    def test_invalidate_after_external_add(self):
+        arr = self.engine._arrays
+        expected = {c.id: float(w) for c, w in zip(arr.conns, arr.weight)}
+        self.net.add_connection(model.Connection(id="new", sourceId="b1-n0", targetId="b2-n0", weight=0.7))
+        self.engine.invalidate()
+        self.assertEqual(self.net.connections[-1].weight, 0.7)
+        for conn in self.net.connections[:-1]:
+            if conn.id in expected:
+                self.assertAlmostEqual(conn.weight, expected[conn.id], places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
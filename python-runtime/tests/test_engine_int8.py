@@ -0,0 +1,69 @@
+"""
+Int8Engine input sums against the float32 engine.
+
+Run from the repository root:
+    python -m unittest discover -s python-runtime/tests
+"""
+import copy
+import importlib
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+model = importlib.import_module("python-runtime.model")
+engine = importlib.import_module("python-runtime.engine")
+engine_int8 = importlib.import_module("python-runtime.engine_int8")
+
+from test_engine_baseline import make_net_data
+
+
+class Int8InputSumTest(unittest.TestCase):
+    def _engines(self, seed: int):
+        data = make_net_data(seed)
+        engines = []
+        for cls in (engine.Engine, engine_int8.Int8Engine):
+            net = model.NeuralNet()
+            net.from_json(copy.deepcopy(data))
+            eng = cls(net)
+            eng._ensure_arrays()
+            engines.append(eng)
+        return engines
+
+    def test_error_bound(self):
+        # Per edge, |w*a - w_q*s * a_q/127| <= |w| / 254 + s / 2 (half a step
+        # of each operand's quantization), scaled by the edge's 1/count for
+        # external brain inputs; the per-target sum bounds the input sum error
+        rng = np.random.default_rng(0)
+        for seed in (1, 2, 3):
+            with self.subTest(seed=seed):
+                ref, q = self._engines(seed)
+                arr = q._arrays
+                q._quantize_weights(arr)
+                w_step = q._row_scale[arr.tgt_idx] * 127
+                edge_bound = (np.abs(arr.weight) / 254 + w_step / 2) * arr.norm
+                bound = np.bincount(arr.tgt_idx, weights=edge_bound, minlength=len(arr.nodes))
+                for _ in range(5):
+                    act = rng.uniform(0.0, 1.0, len(arr.nodes)).astype(np.float32)
+                    act[rng.random(act.size) < 0.3] = 0.0 # Silent sources
+                    ref.net.act[:] = act
+                    q.net.act[:] = act
+                    expected = ref._accumulate_inputs(ref._arrays)
+                    actual = q._accumulate_inputs(arr)
+                    np.testing.assert_array_less(np.abs(actual - expected), bound + 1e-5)
+
+    def test_requantizes_after_learning(self):
+        # A weight change marks the arrays dirty and the int8 weights follow
+        _, q = self._engines(1)
+        arr = q._arrays
+        q._accumulate_inputs(arr)
+        arr.weight[:] = 0.5
+        arr.weights_dirty = True
+        q._accumulate_inputs(arr)
+        self.assertTrue(np.all(q._w_q[arr.weight != 0] == 127))
+
+
+if __name__ == "__main__":
+    unittest.main()
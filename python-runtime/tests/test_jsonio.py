@@ -0,0 +1,71 @@
+"""
+Network JSON I/O with and without orjson.
+
+Run from the repository root:
+    python -m unittest discover -s python-runtime/tests
+"""
+import importlib
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+model = importlib.import_module("python-runtime.model")
+jsonio = importlib.import_module("python-runtime.jsonio")
+
+from test_engine_baseline import make_net_data
+
+
+class JsonIOTest(unittest.TestCase):
+    def setUp(self):
+        net = model.NeuralNet()
+        net.from_json(make_net_data(1))
+        # Through the stdlib codec, as the TS app would read it
+        self.data = json.loads(json.dumps(net.to_json()))
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "net.json")
+
+    def _codecs(self):
+        # (name, orjson module or None); orjson only where installed
+        yield "json", None
+        if jsonio.orjson is not None:
+            yield "orjson", jsonio.orjson
+
+    def test_round_trip(self):
+        for save_name, save_codec in self._codecs():
+            for load_name, load_codec in self._codecs():
+                with self.subTest(save=save_name, load=load_name):
+                    with mock.patch.object(jsonio, "orjson", save_codec):
+                        jsonio.save_json(self.path, self.data)
+                    with mock.patch.object(jsonio, "orjson", load_codec):
+                        self.assertEqual(jsonio.load_json(self.path), self.data)
+
+    def test_indented_like_stdlib(self):
+        for name, codec in self._codecs():
+            with self.subTest(codec=name), mock.patch.object(jsonio, "orjson", codec):
+                jsonio.save_json(self.path, {"a": [1, 2], "b": {"c": 0.5}})
+                with open(self.path) as f:
+                    self.assertEqual(f.read(), json.dumps({"a": [1, 2], "b": {"c": 0.5}}, indent=2))
+
+    def test_empty_file_raises(self):
+        open(self.path, "w").close()
+        for name, codec in self._codecs():
+            with self.subTest(codec=name), mock.patch.object(jsonio, "orjson", codec):
+                with self.assertRaises(ValueError):
+                    jsonio.load_json(self.path)
+
+    @unittest.skipIf(jsonio.orjson is None, "orjson not installed")
+    def test_numpy_values(self):
+        # Only the orjson path serializes numpy scalars / arrays directly
+        jsonio.save_json(self.path, {"w": np.arange(3, dtype=np.float32)})
+        self.assertEqual(jsonio.load_json(self.path), {"w": [0.0, 1.0, 2.0]})
+
+
+if __name__ == "__main__":
+    unittest.main()
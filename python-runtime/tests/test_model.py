@@ -0,0 +1,117 @@
+"""
+NeuralNet storage: array-backed records, checkpoints and module lookup.
+
+Run from the repository root:
+    python -m unittest discover -s python-runtime/tests
+"""
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+model = importlib.import_module("python-runtime.model")
+engine = importlib.import_module("python-runtime.engine")
+
+from test_engine_baseline import make_net_data
+
+
+class IncrementalBuildTest(unittest.TestCase):
+    def test_add_matches_bulk_load(self):
+        # Built one record at a time (growing in spare capacity), the arrays
+        # equal those of a bulk from_json load
+        data = make_net_data(1)
+        bulk = model.NeuralNet()
+        bulk.from_json(data)
+
+        net = model.NeuralNet()
+        for c in data["connections"][:50]: # Added before their endpoints exist
+            net.add_connection(model.Connection(**c))
+        for n in data["nodes"]:
+            net.add_node(model.Node(**n))
+        for c in data["connections"][50:]:
+            net.add_connection(model.Connection(**c))
+
+        for name in list(model._NODE_ARRAYS) + list(model._CONN_ARRAYS):
+            if name == "decay":
+                continue # from_json forces OUTPUT decay
+            np.testing.assert_array_equal(getattr(net, name), getattr(bulk, name), err_msg=name)
+        self.assertEqual(net.nodes["b1-n3"].threshold, bulk.nodes["b1-n3"].threshold)
+
+    def test_growth_keeps_views_consistent(self):
+        net = model.NeuralNet()
+        for k in range(100):
+            net.add_node(model.Node(id=f"n{k}", type="HIDDEN", x=0, y=0, potential=k / 4))
+            self.assertEqual(len(net.pot), k + 1)
+        self.assertEqual([net.nodes[f"n{k}"].potential for k in range(100)], [k / 4 for k in range(100)])
+        # Replacing an existing id reuses its row
+        net.add_node(model.Node(id="n7", type="HIDDEN", x=0, y=0, potential=9.0))
+        self.assertEqual(len(net.pot), 100)
+        self.assertEqual(net.pot[7], 9.0)
+
+
+class ModuleMapTest(unittest.TestCase):
+    NODE_IDS = ["input-1-0", "input-1-12", "input-1-2", "input-2-n3", "input-x", "brain-1-n0",
+                "brain--n1", "brain", "brainx-1", "b-n4", "layer-1-a-1"]
+
+    def _net(self, module_ids):
+        net = model.NeuralNet()
+        net.from_json({"modules": [{"id": m, "type": "BRAIN", "x": 0, "y": 0, "nodeCount": 0}
+                                   for m in module_ids],
+                       "nodes": [{"id": nid, "type": "HIDDEN", "x": 0, "y": 0} for nid in self.NODE_IDS]})
+        return net
+
+    def test_prefix_semantics(self):
+        # The original modules x nodes startswith(module id + "-") scan, in
+        # which the last matching module in module order wins
+        for module_ids in (["input", "input-1", "brain", "b", "layer-1"],
+                           ["input-1", "input", "layer-1-a", "layer-1", "brain-1"]):
+            with self.subTest(modules=module_ids):
+                expected = {}
+                for mod_id in module_ids:
+                    for nid in self.NODE_IDS:
+                        if nid.startswith(mod_id + "-"):
+                            expected[nid] = mod_id
+                net = self._net(module_ids)
+                self.assertEqual(net.nodeModuleMap, expected)
+                for mod_id in module_ids:
+                    ids = [nid for nid in self.NODE_IDS if expected.get(nid) == mod_id]
+                    self.assertEqual(net.moduleNodes.get(mod_id, []), ids)
+                    self.assertEqual(net.sortedModuleNodes.get(mod_id, []),
+                                     sorted(ids, key=model._node_sort_key))
+
+    def test_sorted_by_trailing_index(self):
+        net = self._net(["input-1"])
+        self.assertEqual(net.sortedModuleNodes["input-1"], ["input-1-0", "input-1-2", "input-1-12"])
+
+
+class NpzCheckpointTest(unittest.TestCase):
+    def test_round_trip(self):
+        # After some learning, a checkpoint restores the same net (dangling
+        # connection endpoints included) and the same arrays bit for bit
+        net = model.NeuralNet()
+        net.from_json(make_net_data(2))
+        eng = engine.Engine(net)
+        for _ in range(20):
+            eng.step()
+        eng.flush()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "net.npz")
+            net.save_npz(path)
+            loaded = model.NeuralNet()
+            loaded.load_npz(path)
+
+        self.assertEqual(loaded.to_json(), net.to_json())
+        for name in list(model._NODE_ARRAYS) + list(model._CONN_ARRAYS):
+            np.testing.assert_array_equal(getattr(loaded, name), getattr(net, name), err_msg=name)
+        self.assertEqual(loaded.nodeModuleMap, net.nodeModuleMap)
+        self.assertEqual(loaded.moduleNodes, net.moduleNodes)
+        self.assertEqual(len(loaded.incoming["b1-n0"]), len(net.incoming["b1-n0"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+"""
+Trainer epochs against the original per-item loop.
+
+The reference presents each row by the original id-suffix / label lookup,
+runs the per-node ReferenceEngine for the item's ticks and clears every
+node of the mapped modules, on plain dict records. Spike jitter uses a
+fixed uniform so both sides draw the same.
+
+Run from the repository root:
+    python -m unittest discover -s python-runtime/tests
+"""
+import copy
+import importlib
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+model = importlib.import_module("python-runtime.model")
+engine = importlib.import_module("python-runtime.engine")
+trainer = importlib.import_module("python-runtime.trainer")
+
+import test_engine_baseline
+from test_engine_baseline import ReferenceEngine, make_net_data
+
+STEPS = 12
+UNIFORM = 0.25
+LABELS = {"con-n0": "red", "con-n1": "green", "con-n2": "blue"}
+ROWS = [{"c": "n0;n2"}, {"c": "green"}, {"c": ""}, {"c": "n1; missing"}, {"c": "blue", "d": "b1-n0"},
+        {"c": "n2"}, {"c": "red;n1"}]
+
+
+def make_training_data(seed: int) -> dict:
+    data = make_net_data(seed)
+    for n in data["nodes"]:
+        if n["id"] in LABELS:
+            n["label"] = LABELS[n["id"]]
+    data["modules"].append({"id": "td", "type": "TRAINING_DATA", "x": 0, "y": 0, "nodeCount": 0,
+                            "name": "td", "trainingData": ROWS,
+                            "trainingConfig": {"conceptMappings": {"con": {"column": "c"},
+                                                                   "gone": {"column": "d"}}}})
+    return data
+
+
+def reference_present(ref: ReferenceEngine, item: dict) -> list:
+    # The original present_item: `modId-part` first, then the first module
+    # node with that label. Returns the ids it activated.
+    hits = []
+    for mod_id in ("con", "gone"):
+        if mod_id not in ref.modules:
+            continue
+        val = item.get("c" if mod_id == "con" else "d")
+        if not val:
+            continue
+        module_ids = [nid for nid in ref.nodes if ref.node_module.get(nid) == mod_id]
+        for part in str(val).split(";"):
+            part = part.strip()
+            if not part:
+                continue
+            nid = f"{mod_id}-{part}"
+            if nid not in ref.nodes:
+                nid = next((m for m in module_ids if LABELS.get(m) == part), None)
+            if nid is not None:
+                node = ref.nodes[nid]
+                node["activation"] = node["potential"] = 1.0
+                node["isFiring"] = True
+                hits.append(nid)
+    return hits
+
+
+def reference_clear(ref: ReferenceEngine):
+    for nid, node in ref.nodes.items():
+        if ref.node_module.get(nid) == "con":
+            node["activation"] = node["potential"] = 0.0
+            node["isFiring"] = False
+
+
+class TrainerBaselineTest(unittest.TestCase):
+    _compare = test_engine_baseline.EngineBaselineTest._compare
+
+    def _run_trainer(self, data: dict, **kwargs):
+        net = model.NeuralNet()
+        net.from_json(copy.deepcopy(data))
+        eng = engine.Engine(net)
+        eng._draw_uniform = lambda n: np.full(n, UNIFORM, dtype=np.float32)
+        trainer.Trainer(net, eng, **kwargs).run_epoch(STEPS, shuffle=False)
+        eng.flush()
+        return net
+
+    def _reference_epoch(self, data: dict, sustain: bool) -> ReferenceEngine:
+        ref = ReferenceEngine(copy.deepcopy(data), UNIFORM)
+        for item in ROWS:
+            held = reference_present(ref, item)
+            for _ in range(STEPS):
+                for nid in held if sustain else ():
+                    ref.nodes[nid]["activation"] = 1.0
+                    ref.nodes[nid]["isFiring"] = True
+                ref.step()
+            reference_clear(ref)
+        return ref
+
+    def test_present_resolves_like_original(self):
+        data = make_training_data(1)
+        net = model.NeuralNet()
+        net.from_json(copy.deepcopy(data))
+        tr = trainer.Trainer(net, engine.Engine(net))
+        ref = ReferenceEngine(copy.deepcopy(data), UNIFORM)
+        ids = list(net.nodes)
+        for row, item in enumerate(ROWS):
+            with self.subTest(item=item):
+                expected = reference_present(ref, item)
+                self.assertEqual([ids[i] for i in tr._resolve_item(item)], expected)
+                self.assertEqual([ids[i] for i in tr._prepared_row(row)], expected)
+
+    def test_epoch(self):
+        for seed in (1, 2, 3):
+            with self.subTest(seed=seed):
+                data = make_training_data(seed)
+                self._compare(self._run_trainer(data), self._reference_epoch(data, sustain=False))
+
+    def test_epoch_sustain(self):
+        for seed in (1, 2, 3):
+            with self.subTest(seed=seed):
+                data = make_training_data(seed)
+                self._compare(self._run_trainer(data, sustain=True),
+                              self._reference_epoch(data, sustain=True))
+
+
+class RunParallelTest(unittest.TestCase):
+    _compare = test_engine_baseline.EngineBaselineTest._compare
+
+    @unittest.skipUnless(engine.Engine(model.NeuralNet()).parallel_supported, "needs Numba")
+    def test_summed_hebbian_deltas(self):
+        # Every item runs from the same start state, one after another in tick
+        # time; the net keeps the last run's node state and the summed
+        # weight changes (capped at 2.0), pruned once at the end
+        data = make_net_data(1)
+        fire = [["con-n0", "con-n2"], ["con-n1"], [], ["con-n0"]]
+        for sustain in (False, True):
+            with self.subTest(sustain=sustain):
+                net = model.NeuralNet()
+                net.from_json(copy.deepcopy(data))
+                eng = engine.Engine(net)
+                eng._draw_uniform = lambda n: np.full(n, UNIFORM, dtype=np.float32)
+                eng.run_parallel([np.array([net.node_index[i] for i in ids], dtype=np.int64)
+                                  for ids in fire], STEPS, workers=2, sustain=sustain)
+                eng.flush()
+
+                no_prune = copy.deepcopy(data)
+                for mod in no_prune["modules"]:
+                    mod["pruningThreshold"] = 0.0
+                w0 = np.array([c["weight"] for c in data["connections"]])
+                delta = np.zeros_like(w0)
+                for b, ids in enumerate(fire):
+                    ref = ReferenceEngine(copy.deepcopy(no_prune), UNIFORM)
+                    ref.tick = b * STEPS
+                    for nid in ids:
+                        ref.nodes[nid].update(activation=1.0, potential=1.0, isFiring=True)
+                    for _ in range(STEPS):
+                        for nid in ids if sustain else ():
+                            ref.nodes[nid].update(activation=1.0, isFiring=True)
+                        ref.step()
+                    delta += [c["weight"] for c in ref.connections] - w0
+                for conn, w in zip(ref.connections, np.minimum(w0 + delta, 2.0)):
+                    conn["weight"] = w
+                ref.connections = [c for c in ref.connections
+                                   if not (c["sourceId"].startswith("b1") and c["targetId"].startswith("b1")
+                                           and c["sourceId"] in ref.nodes and c["targetId"] in ref.nodes
+                                           and abs(c["weight"]) < 0.05)]
+                self._compare(net, ref)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,20 +1,31 @@
 import argparse
-import json
+import logging
 import os
 import time
 from .model import NeuralNet
+from .jsonio import load_json, save_json
 from .engine import Engine
 from .trainer import Trainer
 
 def main():
     parser = argparse.ArgumentParser(description='Headless Neural Network Trainer')
-    parser.add_argument('input_file', help='Path to input JSON network file')
-    parser.add_argument('output_file', help='Path to save output JSON network file')
+    parser.add_argument('input_file', help='Path to input network file (JSON or .npz)')
+    parser.add_argument('output_file', help='Path to save output network file (JSON or .npz)')
     parser.add_argument('--epochs', type=int, default=1, help='Number of epochs (passes through data)')
     parser.add_argument('--steps_per_item', type=int, default=50, help='Simulation ticks per data item')
     parser.add_argument('--shuffle', action='store_true', default=True, help='Shuffle data order')
+    parser.add_argument('--debug', action='store_true', help='Print firing nodes every tick')
+    parser.add_argument('--seed', type=int, help='Seed for the data shuffling order')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Items run concurrently per mini-batch (weight changes are summed)')
+    parser.add_argument('--sustain', action='store_true',
+                        help="Hold each item's concept nodes active for all of its ticks")
+    parser.add_argument('--format', choices=['json', 'npz'],
+                        help='Output file format (default: inferred from the output file suffix)')
 
     args = parser.parse_args()
+    # Trainer progress goes through logging; print it like the rest of the output
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
 
     if not os.path.exists(args.input_file):
         print(f"Error: Input file '{args.input_file}' not found.")
@@ -23,16 +34,17 @@ def main():
     print(f"Loading network from {args.input_file}...")
     start_load = time.time()
     
-    with open(args.input_file, 'r') as f:
-        data = json.load(f)
-    
     net = NeuralNet()
-    net.from_json(data)
+    if args.input_file.endswith('.npz'):
+        net.load_npz(args.input_file)
+    else:
+        net.from_json(load_json(args.input_file))
     
     print(f"Network loaded. {len(net.nodes)} nodes.")
     
-    engine = Engine(net)
-    trainer = Trainer(net, engine)
+    engine = Engine(net, debug=args.debug)
+    trainer = Trainer(net, engine, seed=args.seed, num_workers=args.workers,
+                      sustain=args.sustain)
     
     if not trainer.training_module:
         print("Error: No TRAINING_DATA module found in network. Cannot train.")
@@ -50,10 +62,12 @@ def main():
     print(f"Training completed in {duration:.2f}s")
     
     print(f"Saving trained network to {args.output_file}...")
-    output_data = net.to_json()
-    
-    with open(args.output_file, 'w') as f:
-        json.dump(output_data, f, indent=2)
+    engine.flush()
+    output_format = args.format or ('npz' if args.output_file.endswith('.npz') else 'json')
+    if output_format == 'npz':
+        net.save_npz(args.output_file)
+    else:
+        save_json(args.output_file, net.to_json())
         
     print("Done.")
 
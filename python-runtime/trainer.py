@@ -1,49 +1,117 @@
-import random
+import logging
 import time
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional
+
+import numpy as np
+
 from .model import NeuralNet, ModuleConfig, Node
 from .engine import Engine
 
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between progress messages during an epoch
+PROGRESS_INTERVAL = 1.0
+
+def _node_idx(nodes: List[Node]) -> np.ndarray:
+    # State array indices of the given (attached) nodes
+    return np.array([n._idx for n in nodes], dtype=np.int64)
+
 class Trainer:
-    def __init__(self, net: NeuralNet, engine: Engine):
+    def __init__(self, net: NeuralNet, engine: Engine, seed: Optional[int] = None,
+                 num_workers: int = 1, sustain: bool = False):
         self.net = net
         self.engine = engine
+        # Hold each item's concept nodes active for all of its ticks instead
+        # of presenting them once and letting them decay
+        self.sustain = sustain
+        # Items run concurrently per mini-batch (Engine.run_parallel); 1 = sequential
+        self.num_workers = num_workers
+        self._rng = np.random.default_rng(seed) # Epoch shuffling
         self.training_module: ModuleConfig = None
         self.data: List[Dict[str, Any]] = []
         self.mappings: Dict[str, Any] = {}
+        # Per mapped module: its node indices (into the net's state arrays)
+        self._module_idx: Dict[str, np.ndarray] = {}
+        # Per mapping (of an existing module): item -> node indices to activate
+        self._presenters: List[Callable[[Dict[str, Any]], List[int]]] = []
+        self._concept_idx = np.zeros(0, dtype=np.int64) # All mapped modules' nodes
+        # Indices of the CONCEPT nodes each data row activates (see _prepare_rows),
+        # row r being _prepared_idx[_prepared_ptr[r]:_prepared_ptr[r + 1]]
+        self._prepared_idx = np.zeros(0, dtype=np.int64)
+        self._prepared_ptr = np.zeros(1, dtype=np.int64)
         
         self._find_training_config()
+        self._index_modules()
+        self._prepare_rows()
 
     def _find_training_config(self):
-        for mod in self.net.modules.values():
-            if mod.type == 'TRAINING_DATA':
-                self.training_module = mod
-                self.data = mod.trainingData or []
-                self.mappings = (mod.trainingConfig or {}).get('conceptMappings', {})
-                print(f"Trainer: Found TRAINING_DATA module '{mod.name}' with {len(self.data)} rows.")
-                return
-        
-        print("Trainer: No TRAINING_DATA module found.")
+        # The first TRAINING_DATA module in module order is used
+        mods = self.net.modules_by_type.get('TRAINING_DATA')
+        if not mods:
+            logger.info("Trainer: No TRAINING_DATA module found.")
+            return
+        mod = mods[0]
+        self.training_module = mod
+        self.data = mod.trainingData or []
+        self.mappings = (mod.trainingConfig or {}).get('conceptMappings', {})
+        logger.info("Trainer: Found TRAINING_DATA module '%s' with %d rows.", mod.name, len(self.data))
+
+    def _index_modules(self):
+        # Call again after adding or removing nodes of the mapped modules
+        self._module_idx = {}
+        for mod_id in self.mappings:
+            nodes = [self.net.nodes[nid] for nid in self.net.moduleNodes.get(mod_id, [])]
+            self._module_idx[mod_id] = _node_idx(nodes)
+        self._presenters = [self._make_presenter(mod_id, config)
+                            for mod_id, config in self.mappings.items() if mod_id in self.net.modules]
+        self._concept_idx = np.concatenate([np.zeros(0, dtype=np.int64), *self._module_idx.values()])
+
+    def _prepare_rows(self):
+        # Resolve every row to its nodes once instead of re-parsing it each
+        # epoch, all rows in one buffer (rows are views into it)
+        rows = [self._resolve_item(item) for item in self.data]
+        self._prepared_idx = np.concatenate([np.zeros(0, dtype=np.int64), *rows])
+        self._prepared_ptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(r) for r in rows], out=self._prepared_ptr[1:])
+
+    def _prepared_row(self, row: int) -> np.ndarray:
+        return self._prepared_idx[self._prepared_ptr[row]:self._prepared_ptr[row + 1]]
 
     def run_epoch(self, steps_per_item: int = 50, shuffle: bool = True):
         if not self.data:
-            print("Trainer: No data to train on.")
+            logger.warning("Trainer: No data to train on.")
             return
 
-        items = list(self.data)
-        if shuffle:
-            random.shuffle(items)
+        n = len(self._prepared_ptr) - 1
+        order = self._rng.permutation(n) if shuffle else np.arange(n)
             
-        print(f"Trainer: Starting epoch with {len(items)} items. {steps_per_item} ticks/item.")
+        logger.info("Trainer: Starting epoch with %d items. %d ticks/item.", len(order), steps_per_item)
         
         start_time = time.time()
+        # Progress is rate-limited so the loop never waits on console output
+        report = logger.isEnabledFor(logging.INFO)
+        last_report = time.monotonic()
         
-        for idx, item in enumerate(items):
-            self.present_item(item)
-            
-            # Run simulation
-            for _ in range(steps_per_item):
-                self.engine.step()
+        parallel = self.num_workers > 1 and self.engine.parallel_supported
+        if self.num_workers > 1 and not parallel:
+            logger.warning("Trainer: Parallel items need Numba and no debug output; running sequentially.")
+        batch = self.num_workers if parallel else 1
+        rows = order.tolist()
+        for start in range(0, len(rows), batch):
+            if parallel:
+                # Each item of the mini-batch runs on its own copy of the node
+                # state; the weight changes of all of them are summed
+                fire_idx = [self._prepared_row(row) for row in rows[start:start + batch]]
+                self.engine.run_parallel(fire_idx, steps_per_item, self.num_workers, sustain=self.sustain)
+            else:
+                self.present_prepared(rows[start])
+
+                # Run simulation
+                if self.sustain:
+                    self.engine.hold_inputs(self._prepared_row(rows[start]))
+                self.engine.step_batch(steps_per_item)
+                if self.sustain:
+                    self.engine.hold_inputs(None)
                 
             # Optional: Reset activations between items?
             # In continuous learning, we might NOT want to hard reset, but let them decay.
@@ -51,88 +119,92 @@ class Trainer:
             # Let's rely on decay for now, or maybe manual clear of inputs.
             self._clear_concept_inputs()
             
-            if (idx + 1) % 10 == 0:
-                print(f"  Processed {idx + 1}/{len(items)} items...")
+            if report and time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                logger.info("  Processed %d/%d items...", min(start + batch, len(rows)), len(rows))
 
         duration = time.time() - start_time
-        print(f"Epoch completed in {duration:.2f}s")
+        logger.info("Epoch completed in %.2fs", duration)
 
     def present_item(self, item: Dict[str, Any]):
         """
         Activates CONCEPT nodes based on the item row and mappings.
         """
+        self._activate(self._resolve_item(item))
+
+    def present_prepared(self, row: int):
+        """
+        Activates the CONCEPT nodes of data row `row`, resolved at load time.
+        """
+        self._activate(self._prepared_row(row))
+
+    def _resolve_item(self, item: Dict[str, Any]) -> np.ndarray:
+        # Indices of the nodes to activate for the item, in mapping / part order
+        idx: List[int] = []
+        for present in self._presenters:
+            idx.extend(present(item))
+        return np.array(idx, dtype=np.int64)
+
+    def _make_presenter(self, mod_id: str, config: Dict[str, Any]) -> Callable[[Dict[str, Any]], List[int]]:
         # Mapping: ModuleID -> { column: "ColName", delimiter: ";" }
-        for mod_id, config in self.mappings.items():
-            if mod_id not in self.net.modules:
-                continue
-                
-            col_name = config.get('column')
-            delimiter = config.get('delimiter', ';')
-            
+        col_name = config.get('column')
+        delimiter = config.get('delimiter', ';')
+
+        # Note: The values in CSV might be IDs ("1") or Labels ("Red") depending on what the CONCEPT module uses.
+        # NeuralNet.ts `addModule` for CONCEPT usually creates nodes with IDs like `modId-conceptId`.
+        # If the CSV contains IDs, we need to match them.
+        # If the CSV contains Labels, we need to match labels?
+        # App.tsx auto-map usually maps by matching Header to Module Name.
+        # But the cell content... in `training-data.csv` we saw semicolon separated IDs (e.g. "1;4").
+
+        # One table for both: parts are matched by Node ID suffix first
+        # (any node `modId-part` of the net), then by the label of the
+        # module's first node carrying it.
+        nodes = self.net.nodes
+        lookup: Dict[str, int] = {}
+        for nid in self.net.moduleNodes.get(mod_id, []):
+            lookup.setdefault(nodes[nid].label, nodes[nid]._idx)
+        prefix = f"{mod_id}-"
+        for nid, i in self.net.node_index.items():
+            if nid.startswith(prefix):
+                lookup[nid[len(prefix):]] = i
+
+        def present(item: Dict[str, Any]) -> List[int]:
             val = item.get(col_name)
             if not val:
-                continue
-            
+                return []
             # Split values (e.g. "1;2")
-            # Note: The values in CSV might be IDs ("1") or Labels ("Red") depending on what the CONCEPT module uses.
-            # NeuralNet.ts `addModule` for CONCEPT usually creates nodes with IDs like `modId-conceptId`.
-            # If the CSV contains IDs, we need to match them.
-            # If the CSV contains Labels, we need to match labels?
-            # App.tsx auto-map usually maps by matching Header to Module Name.
-            # But the cell content... in `training-data.csv` we saw semicolon separated IDs (e.g. "1;4").
-            
-            # Let's try to match by Node ID suffix first.
-            parts = str(val).split(delimiter)
-            
-            module_nodes = [n for n in self.net.nodes.values() if self.net.nodeModuleMap.get(n.id) == mod_id]
-            
-            for part in parts:
-                part = part.strip()
-                if not part: continue
-                
-                # Try to find node
-                # 1. Exact ID match (suffix)
-                # Node IDs are `modId-conceptId`.
-                target_node = None
-                
-                # Check for ID match
-                candidate_id = f"{mod_id}-{part}"
-                if candidate_id in self.net.nodes:
-                    target_node = self.net.nodes[candidate_id]
-                else:
-                    # Check for Label match
-                    for n in module_nodes:
-                        if n.label == part:
-                            target_node = n
-                            break
-                            
-                if target_node:
-                    # Force Activation
-                    target_node.activation = 1.0
-                    target_node.potential = 1.0
-                    target_node.isFiring = True
-                    # Set a flag or ensure it stays high during this step?
-                    # Since we call `step()` multiple times, relies on `activationType` or manual re-application.
-                    # If it's PULSE, it fires once.
-                    # If it's SUSTAINED, it stays.
-                    # Concept Nodes are usually PULSE (default in addModule) or SUSTAINED?
-                    # Let's Set it to 1.0. If it decays, it decays.
-                    # BUT, `step()` might process it.
-                    # For robust training, we often want to HOLD the input for the duration.
-                    # But `present_item` is called ONCE per item.
-                    # If we want it held, we need to modify how `step` works or update `present_item` to be called every tick?
-                    # Better: Set `activationType` to SUSTAINED temporarily?
-                    # Or just rely on slow decay?
-                    # The USER said "Headless Python Runtime". 
-                    # Let's assume setting it once is enough to trigger the Hebbian association 
-                    # if the Brain nodes fire shortly after.
-                    pass
+            parts = (part.strip() for part in str(val).split(delimiter))
+            hits = (lookup.get(part) for part in parts if part)
+            return [i for i in hits if i is not None]
+
+        return present
+
+    def _activate(self, idx: np.ndarray):
+        # Force Activation
+        self.net.act[idx] = 1.0
+        self.net.pot[idx] = 1.0
+        self.net.firing[idx] = True
+        # Set a flag or ensure it stays high during this step?
+        # Since we call `step()` multiple times, relies on `activationType` or manual re-application.
+        # If it's PULSE, it fires once.
+        # If it's SUSTAINED, it stays.
+        # Concept Nodes are usually PULSE (default in addModule) or SUSTAINED?
+        # Let's Set it to 1.0. If it decays, it decays.
+        # BUT, `step()` might process it.
+        # For robust training, we often want to HOLD the input for the duration.
+        # But `present_item` is called ONCE per item.
+        # If we want it held, we need to modify how `step` works or update `present_item` to be called every tick?
+        # Better: Set `activationType` to SUSTAINED temporarily?
+        # Or just rely on slow decay?
+        # The USER said "Headless Python Runtime". 
+        # Let's assume setting it once is enough to trigger the Hebbian association 
+        # if the Brain nodes fire shortly after.
 
     def _clear_concept_inputs(self):
         # Optional: Force reset concepts to 0
-        for mod_id in self.mappings.keys():
-             module_nodes = [n for n in self.net.nodes.values() if self.net.nodeModuleMap.get(n.id) == mod_id]
-             for n in module_nodes:
-                 n.activation = 0.0
-                 n.potential = 0.0
-                 n.isFiring = False
+        # All mapped nodes, not just the presented ones: a SUSTAINED concept
+        # node with incoming edges is also charged by the network
+        self.net.act[self._concept_idx] = 0.0
+        self.net.pot[self._concept_idx] = 0.0
+        self.net.firing[self._concept_idx] = False